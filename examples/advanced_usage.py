@@ -11,8 +11,18 @@ This script demonstrates advanced patterns including:
 
 from stage_manager.stage_manager import StageManager
 from stage_manager.models import TaskContext, Stage
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import Dict, List, Optional
 import json
+import logging
+import sys
+
+
+# Configure logging to see what's happening
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
 
 
 class TaskFlowManager:
@@ -35,11 +45,59 @@ class TaskFlowManager:
         self.current_stage_index = 0
         self.manager = StageManager(config=config)
         self.history: List[str] = []
+        
+        # Serialize the task once; only current_stage changes between turns
+        self._context_cache = self.task_context.to_dict()
+        
+        # Speculative classifications for likely next inputs, keyed by input text;
+        # the worker pool is only started by the first prefetch()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._speculative: Dict[str, Future] = {}
     
     def get_current_stage(self) -> Stage:
         """Get the current stage object."""
         return self.task_context.stages[self.current_stage_index]
     
+    def _current_context(self) -> Dict:
+        """Return the cached task context dict patched with the current stage."""
+        self._context_cache["current_stage"] = self.get_current_stage().stage
+        return self._context_cache
+    
+    def prefetch(self, candidate_inputs: List[str]):
+        """
+        Speculatively classify likely next inputs in the background.
+        
+        With an LLM backend this overlaps classification round-trips with
+        the caller's own work; a later process_input() call with a matching
+        input reuses the result. Every candidate costs a classification, so
+        only pass inputs the caller actually expects (e.g. quick-reply buttons).
+        
+        Args:
+            candidate_inputs: Inputs to classify ahead of time
+        """
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=4)
+        
+        # Background workers get their own copy; the cache is patched every turn
+        context_dict = dict(self._current_context())
+        for user_input in candidate_inputs:
+            if user_input not in self._speculative:
+                self._speculative[user_input] = self._executor.submit(
+                    self.manager.classify, user_input, context_dict
+                )
+    
+    def _invalidate_speculation(self):
+        """Drop speculative results computed for a stale stage."""
+        for future in self._speculative.values():
+            future.cancel()
+        self._speculative.clear()
+    
+    def close(self):
+        """Release the background classification workers, if any were started."""
+        self._invalidate_speculation()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+    
     def process_input(self, user_input: str) -> Dict:
         """
         Process user input and handle stage transitions.
@@ -50,17 +108,19 @@ class TaskFlowManager:
         Returns:
             Dictionary with status, message, and current stage info
         """
-        # Add current stage to context
-        context_dict = self.task_context.to_dict()
-        context_dict["current_stage"] = self.get_current_stage().stage
-        
-        # Classify the input
-        result = self.manager.classify(user_input, context_dict)
+        # Reuse a speculative classification when the guess was right,
+        # waiting for it if it is still in flight rather than repeating it
+        future = self._speculative.pop(user_input, None)
+        if future is not None and not future.cancelled():
+            result = future.result()
+        else:
+            result = self.manager.classify(user_input, self._current_context())
         
         # Handle stage transitions
         if result["status"] == "NEXT":
             if self.current_stage_index < len(self.task_context.stages) - 1:
                 self.current_stage_index += 1
+                self._invalidate_speculation()
                 self.history.append(f"Moved to stage: {self.get_current_stage().stage}")
                 result["current_stage"] = self.get_current_stage().stage
             else:
@@ -69,12 +129,14 @@ class TaskFlowManager:
         elif result["status"] == "PREVIOUS":
             if self.current_stage_index > 0:
                 self.current_stage_index -= 1
+                self._invalidate_speculation()
                 self.history.append(f"Moved back to stage: {self.get_current_stage().stage}")
                 result["current_stage"] = self.get_current_stage().stage
             else:
                 result["message"] = "Already at the first stage"
         
         elif result["status"] == "EXIT":
+            self._invalidate_speculation()
             self.history.append("Task exited")
             result["task_completed"] = False
         
@@ -114,6 +176,9 @@ def example_task_flow_system():
     # Create task flow manager
     flow = TaskFlowManager(task)
     
+    # Replies offered as buttons in the UI; users often pick one of these
+    quick_replies = ["next please", "go back", "help me with this"]
+    
     # Simulate user interactions
     interactions = [
         "hello",
@@ -125,15 +190,24 @@ def example_task_flow_system():
         "proceed to the next step"
     ]
     
-    for user_input in interactions:
-        print(f"\nUser: {user_input}")
-        result = flow.process_input(user_input)
-        print(f"Status: {result['status']}")
-        print(f"Message: {result['message']}")
-        
-        progress = flow.get_progress()
-        print(f"Current Stage: {progress['current_stage']} ({progress['stage_index'] + 1}/{progress['total_stages']})")
-        print(f"Progress: {progress['progress_percentage']:.1f}%")
+    try:
+        for user_input in interactions:
+            result = flow.process_input(user_input)
+            progress = flow.get_progress()
+            
+            # One write per turn instead of a print per line
+            sys.stdout.write(
+                f"\nUser: {user_input}\n"
+                f"Status: {result['status']}\n"
+                f"Message: {result['message']}\n"
+                f"Current Stage: {progress['current_stage']} ({progress['stage_index'] + 1}/{progress['total_stages']})\n"
+                f"Progress: {progress['progress_percentage']:.1f}%\n"
+            )
+            
+            # Classify the quick replies while the user is reading the reply
+            flow.prefetch(quick_replies)
+    finally:
+        flow.close()
 
 
 def example_configuration_management():
@@ -286,7 +360,7 @@ def example_unicode_handling():
     
     print("\nTesting unicode and special characters:")
     for user_input in unicode_inputs:
-        result = manager.classify(user_input)
+        result = manager.classify_cached(user_input)
         print(f"\n  Input: {user_input}")
         print(f"  Status: {result['status']}")
         print(f"  Message: {result['message'][:50]}...")
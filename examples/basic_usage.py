@@ -8,6 +8,13 @@ user input and navigate through multi-stage tasks.
 
 from stage_manager.stage_manager import StageManager
 import json
+import logging
+
+# Configure logging to see what's happening
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
 
 
 def example_basic_classification():
@@ -30,8 +37,8 @@ def example_basic_classification():
         "banana smoothie"
     ]
     
-    for user_input in test_inputs:
-        result = manager.classify(user_input)
+    results = manager.classify_many(test_inputs)
+    for user_input, result in zip(test_inputs, results):
         print(f"\nInput: '{user_input}'")
         print(f"Status: {result['status']}")
         print(f"Message: {result['message']}")
@@ -78,7 +85,7 @@ def example_with_task_context():
     ]
     
     for user_input, description in test_cases:
-        result = manager.classify(user_input, task_context)
+        result = manager.classify_cached(user_input, task_context)
         print(f"\n{description}")
         print(f"Input: '{user_input}'")
         print(f"Status: {result['status']}")
@@ -68,8 +68,8 @@ def example_bedrock_with_config():
         ]
         
         print("\nTesting classification with Bedrock:")
-        for user_input in test_inputs:
-            result = manager.classify(user_input)
+        results = manager.classify_many(test_inputs)
+        for user_input, result in zip(test_inputs, results):
             print(f"\n  Input: '{user_input}'")
             print(f"  Status: {result['status']}")
             print(f"  Message: {result['message'][:60]}...")
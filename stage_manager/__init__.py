@@ -12,9 +12,19 @@ from .stage_manager import StageManager
 from .input_validator import InputValidator
 from .classification_engine import ClassificationEngine
 from .response_generator import ResponseGenerator
-from .llm_client import LLMClient, LLMConnectionError, LLMTimeoutError, LLMResponseError
 from .models import Stage, TaskContext, ClassificationResponse
 
+# LLM client names are resolved on first access (PEP 562) so that importing
+# the package does not pull in boto3 and requests
+_LAZY_LLM_EXPORTS = {"LLMClient", "LLMConnectionError", "LLMTimeoutError", "LLMResponseError"}
+
+
+def __getattr__(name):
+    if name in _LAZY_LLM_EXPORTS:
+        from . import llm_client
+        return getattr(llm_client, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 __all__ = [
     "StageManager",
     "InputValidator",
@@ -0,0 +1,68 @@
+"""JSON helpers that use orjson when it is installed."""
+
+import json
+from typing import Any, Union
+
+# orjson is imported on first use so that importing the package (e.g. for
+# pattern-only classification) doesn't pay for loading it
+_UNRESOLVED = object()
+_orjson = _UNRESOLVED
+
+
+def _load_orjson():
+    """Import orjson once, returning None when it isn't installed."""
+    global _orjson
+    try:
+        import orjson
+    except ImportError:  # Optional: faster JSON encoding/decoding
+        orjson = None
+    _orjson = orjson
+    return orjson
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    """
+    Parse JSON text or UTF-8 bytes.
+    
+    Inputs orjson rejects but the stdlib accepts (NaN, integers wider than
+    64 bits) are retried with json.loads, so results and errors match json.
+    
+    Args:
+        data: JSON document as str or bytes
+        
+    Returns:
+        Parsed Python object
+        
+    Raises:
+        json.JSONDecodeError: If the document is malformed
+    """
+    orjson = _orjson if _orjson is not _UNRESOLVED else _load_orjson()
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(data)
+
+
+def dumps(obj: Any) -> bytes:
+    """
+    Serialize obj to JSON bytes for request bodies.
+    
+    Objects orjson rejects (lone surrogates from badly decoded input,
+    non-string keys) are retried with json.dumps, whose ASCII escaping
+    encodes them as json did before orjson was used.
+    
+    Args:
+        obj: JSON-serializable object
+        
+    Returns:
+        Encoded JSON document
+    """
+    orjson = _orjson if _orjson is not _UNRESOLVED else _load_orjson()
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj)
+        except TypeError:
+            pass
+    return json.dumps(obj).encode("ascii")
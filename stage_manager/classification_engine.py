@@ -1,41 +1,100 @@
 """Classification engine for determining user intent."""
 
 from typing import Dict, Optional, List
+import functools
+import json
 import re
+import sys
 import logging
 
+from .input_validator import InputValidator
+from .models import VALID_STATUS_CODES
+
 
 # Configure logger for this module
 logger = logging.getLogger(__name__)
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+
+# Matches stage references like "at stage X" or "stage X" in lower-cased input
+_STAGE_PATTERN = re.compile(r'(?:at\s+)?stage\s+(\w+)')
+
+# Base instructions shared by single and batch LLM prompts
+_PROMPT_INSTRUCTIONS = """You are a task navigation assistant. Classify the user's intent into one of these status codes:
+
+- NEXT: User wants to proceed to the next stage
+- PREVIOUS: User wants to go back to the previous stage
+- EXIT: User wants to quit or leave the task
+- HELP: User needs assistance or information
+- CARE: User expresses concern, emotion, or needs support
+- HELLO: User is greeting or introducing themselves
+- UNKNOWN: Intent is unclear or doesn't match other categories
+
+"""
+
+# Response format instructions closing single and batch LLM prompts
+_RESPONSE_FORMAT = (
+    "Respond with ONLY the status code (one word) followed by a brief explanation.\n"
+    "Format: STATUS_CODE: explanation"
+)
+_BATCH_RESPONSE_FORMAT = (
+    "Classify each input independently. Respond with ONLY a JSON array containing one object per input, in the same order.\n"
+    'Format: [{"status": "STATUS_CODE", "message": "explanation"}, ...]'
 )
 
 
 class ClassificationEngine:
     """Core classification logic with LLM integration and context awareness."""
     
-    def __init__(self, config: Optional[Dict] = None, llm_client=None):
+    __slots__ = (
+        "config",
+        "llm_client",
+        "_classification_rules",
+        "_system_prompt_frozen",
+        "_streams_status",
+        "_rule_patterns",
+        "_match_rules_cached",
+        # Keep a per-instance __dict__ so callers can still set or patch
+        # their own attributes; the hot attributes above stay in slots
+        "__dict__",
+    )
+    
+    def __init__(self, config: Optional[Dict] = None, llm_client=None, owns_llm_client: bool = False):
         """
         Initialize with optional configuration and LLM client.
         
         Args:
             config: Optional configuration dictionary for classification rules
             llm_client: Optional LLM client for classification
+            owns_llm_client: True if the client was created for this engine alone.
+                Only then are the fixed instructions installed as the client's
+                system prompt; a shared client is left untouched and gets the
+                instructions in every prompt instead.
         """
+        self._system_prompt_frozen = False
+        self._streams_status = False
         try:
             self.config = config or self._get_default_config()
             self.llm_client = llm_client
-            classification_rules = self.config.get("classification_rules", self._get_default_classificartion_rules())
             
-            # Validate classification_rules is a dict, fall back to defaults if not
-            if not isinstance(classification_rules, dict):
-                logger.warning("Classification rules is not a dictionary, using defaults")
-                default_config = self._get_default_classificartion_rules()
-                self.classification_rules = default_config["classification_rules"]
-            else:
-                self.classification_rules = classification_rules
+            # An owned client gets the fixed instructions once as its system
+            # prompt, so each request only carries the task context and user input
+            if owns_llm_client and self.llm_client is not None:
+                self.llm_client.set_system_prompt(_PROMPT_INSTRUCTIONS)
+                self._system_prompt_frozen = True
+            
+            # Only a real LLMClient can stop reading once the status arrives;
+            # duck-typed clients are only relied on for classify()
+            if self.llm_client is not None:
+                from .llm_client import LLMClient
+                self._streams_status = isinstance(self.llm_client, LLMClient)
+            
+            classification_rules = self.config.get(
+                "classification_rules", self._get_default_config()["classification_rules"]
+            )
+            
+            # The setter validates and compiles the rules
+            self.classification_rules = classification_rules
+            if self.classification_rules is classification_rules:
                 logger.info("Classification engine initialized with custom rules")
             
             if self.llm_client:
@@ -51,7 +110,7 @@ class ClassificationEngine:
             self.classification_rules = default_config["classification_rules"]
             logger.info("Fell back to default configuration")
     
-    def _get_default_classificartion_rules(self) -> Dict:
+    def _get_default_config(self) -> Dict:
         """Get default classification configuration."""
         return {
             "classification_rules": {
@@ -64,6 +123,76 @@ class ClassificationEngine:
             }
         }
     
+    @property
+    def classification_rules(self) -> Dict:
+        """Mapping of status code to the patterns that select it, in priority order."""
+        return self._classification_rules
+    
+    @classification_rules.setter
+    def classification_rules(self, classification_rules: Dict):
+        """
+        Replace the classification rules and recompile the scan table.
+        
+        Rules are compiled when assigned, so edit them by assigning a new
+        mapping; changes made in place to the current one are not seen.
+        Invalid rules (not a dict) fall back to the defaults.
+        """
+        # Validate classification_rules is a dict, fall back to defaults if not
+        if not isinstance(classification_rules, dict):
+            logger.warning("Classification rules is not a dictionary, using defaults")
+            classification_rules = self._get_default_config()["classification_rules"]
+        
+        self._classification_rules = classification_rules
+        self._compile_rules()
+    
+    def _compile_rules(self):
+        """
+        Compile the classification rules into a flat scan table.
+        
+        Patterns are validated once here and flattened into (pattern, status_code)
+        pairs in rule order, so classification is a single pass of C-level
+        substring checks with no per-call type checking or nested loops.
+        """
+        compiled = []
+        
+        for status_code, patterns in self.classification_rules.items():
+            if not isinstance(patterns, list):
+                logger.warning(f"Patterns for {status_code} is not a list, skipping")
+                continue
+            
+            # Codes from JSON-loaded configs are fresh strings; interning them
+            # lets downstream code-keyed dict lookups match by identity
+            if isinstance(status_code, str):
+                status_code = sys.intern(status_code)
+            
+            for pattern in patterns:
+                if not isinstance(pattern, str):
+                    logger.warning(f"Pattern {pattern} for {status_code} is not a string, skipping")
+                    continue
+                compiled.append((pattern, status_code))
+        
+        self._rule_patterns = tuple(compiled)
+        
+        # Repeated utterances ("next", "help", "hi") skip the scan entirely;
+        # recompiling the rules starts a fresh cache
+        self._match_rules_cached = functools.lru_cache(maxsize=256)(self._match_rules)
+    
+    def _match_rules(self, normalized_input: str) -> Optional[str]:
+        """
+        Find the first status code, in rule order, with a pattern in the input.
+        
+        Args:
+            normalized_input: Lower-cased, stripped user input
+            
+        Returns:
+            Matching status code, or None if no pattern matches
+        """
+        for pattern, status_code in self._rule_patterns:
+            if pattern in normalized_input:
+                logger.debug("Pattern '%s' matched for status code %s", pattern, status_code)
+                return status_code
+        return None
+    
     def classify_intent(self, user_input: str, task_context: Optional[Dict] = None) -> str:
         """
         Determine the status code from user input and context using LLM.
@@ -80,21 +209,25 @@ class ClassificationEngine:
                 logger.warning("Empty user input provided to classify_intent")
                 return "UNKNOWN"
             
-            logger.debug(f"Classifying input: '{user_input[:50]}...'")
+            logger.debug("Classifying input: '%.50s...'", user_input)
             
             # If LLM client is available, use it for classification
             if self.llm_client:
                 try:
                     logger.debug("Using LLM for classification")
                     prompt = self._build_llm_prompt(user_input, task_context)
-                    response = self.llm_client.classify(prompt)
                     
-                    # Extract status from LLM response
-                    status = response.get("status", "UNKNOWN")
+                    # Only the status is used, so let clients that can stop early do so
+                    if self._streams_status:
+                        status = self.llm_client.classify_status(prompt)
+                    else:
+                        response = self.llm_client.classify(prompt)
+                        
+                        # Extract status from LLM response
+                        status = response.get("status", "UNKNOWN")
                     
                     # Validate status is one of the valid codes
-                    valid_statuses = {"NEXT", "PREVIOUS", "EXIT", "HELP", "CARE", "HELLO", "UNKNOWN"}
-                    if status not in valid_statuses:
+                    if status not in VALID_STATUS_CODES:
                         logger.warning(f"LLM returned invalid status '{status}', falling back to UNKNOWN")
                         return "UNKNOWN"
                     
@@ -106,51 +239,119 @@ class ClassificationEngine:
                     # Fall through to pattern-based classification
             
             # Fall back to pattern-based classification if LLM is not available or fails
-            normalized_input = user_input.lower().strip()
+            return self._classify_with_rules(user_input, task_context)
             
-            # Extract stage information (prioritizes user input over context)
-            current_stage = self.extract_stage_info(user_input, task_context)
-            if current_stage:
-                logger.debug(f"Current stage identified: {current_stage}")
+        except Exception as e:
+            logger.error(f"Error during intent classification: {e}", exc_info=True)
+            # Fail gracefully by returning UNKNOWN
+            return "UNKNOWN"
+    
+    def _classify_with_rules(self, user_input: str, task_context: Optional[Dict] = None) -> str:
+        """
+        Classify user input using the pattern rules and stage boundaries.
+        
+        Args:
+            user_input: User's text input (non-empty)
+            task_context: Optional task context with stages
             
-            # Check each status code pattern
-            for status_code, patterns in self.classification_rules.items():
-                if not isinstance(patterns, list):
-                    logger.warning(f"Patterns for {status_code} is not a list, skipping")
-                    continue
+        Returns:
+            One of the configured status codes, or UNKNOWN
+        """
+        normalized_input = InputValidator.normalize_input(user_input)
+        
+        # Find the highest-priority status code with a matching pattern
+        status_code = self._match_rules_cached(normalized_input)
+        if status_code is not None:
+            # Apply stage-aware logic for PREVIOUS and NEXT; other intents
+            # never need the stage, so it is only extracted here
+            if status_code in ("PREVIOUS", "NEXT") and task_context:
+                # Extract stage information (prioritizes user input over context)
+                current_stage = self._extract_stage_from_normalized(normalized_input, task_context)
+                if current_stage:
+                    logger.debug("Current stage identified: %s", current_stage)
                     
-                for pattern in patterns:
-                    if not isinstance(pattern, str):
-                        logger.warning(f"Pattern {pattern} for {status_code} is not a string, skipping")
-                        continue
-                        
-                    if pattern in normalized_input:
-                        logger.debug(f"Pattern '{pattern}' matched for status code {status_code}")
-                        
-                        # Apply stage-aware logic for PREVIOUS and NEXT
-                        if status_code == "PREVIOUS" and task_context and current_stage:
-                            # If at first stage, don't allow PREVIOUS
-                            if self.is_at_first_stage(task_context, current_stage):
-                                logger.info("PREVIOUS requested at first stage, returning UNKNOWN")
-                                return "UNKNOWN"
-                        
-                        if status_code == "NEXT" and task_context and current_stage:
-                            # If at last stage, don't allow NEXT
-                            if self.is_at_last_stage(task_context, current_stage):
-                                logger.info("NEXT requested at last stage, returning UNKNOWN")
-                                return "UNKNOWN"
-                        
-                        logger.info(f"Classified as {status_code}")
-                        return status_code
+                    # If at first stage, don't allow PREVIOUS
+                    if status_code == "PREVIOUS" and self.is_at_first_stage(task_context, current_stage):
+                        logger.info("PREVIOUS requested at first stage, returning UNKNOWN")
+                        return "UNKNOWN"
+                    
+                    # If at last stage, don't allow NEXT
+                    if status_code == "NEXT" and self.is_at_last_stage(task_context, current_stage):
+                        logger.info("NEXT requested at last stage, returning UNKNOWN")
+                        return "UNKNOWN"
             
-            # Default to UNKNOWN if no pattern matches
-            logger.info("No pattern matched, returning UNKNOWN")
-            return "UNKNOWN"
+            logger.debug("Classified as %s", status_code)
+            return status_code
+        
+        # Default to UNKNOWN if no pattern matches
+        logger.debug("No pattern matched, returning UNKNOWN")
+        return "UNKNOWN"
+    
+    def classify_intents(self, user_inputs: List[str], task_context: Optional[Dict] = None) -> List[str]:
+        """
+        Classify a batch of user inputs against the same task context.
+        
+        Args:
+            user_inputs: List of user text inputs
+            task_context: Optional task context shared by all inputs
             
+        Returns:
+            List of status codes, one per input, in input order
+        """
+        if self.llm_client:
+            batched = self._classify_batch_with_llm(user_inputs, task_context)
+            if batched is not None:
+                return batched
+            return [self.classify_intent(user_input, task_context) for user_input in user_inputs]
+        
+        # Pattern-only engines skip the per-call LLM dispatch entirely
+        results = []
+        for user_input in user_inputs:
+            if not user_input:
+                results.append("UNKNOWN")
+                continue
+            try:
+                results.append(self._classify_with_rules(user_input, task_context))
+            except Exception as e:
+                logger.error(f"Error during intent classification: {e}", exc_info=True)
+                results.append("UNKNOWN")
+        return results
+    
+    def _classify_batch_with_llm(self, user_inputs: List[str], task_context: Optional[Dict] = None) -> Optional[List[str]]:
+        """
+        Classify several inputs with a single LLM request.
+        
+        Args:
+            user_inputs: List of user text inputs
+            task_context: Optional task context shared by all inputs
+            
+        Returns:
+            List of status codes in input order, or None if the client cannot
+            batch or the batched request failed
+        """
+        indices = [i for i, user_input in enumerate(user_inputs) if user_input]
+        if len(indices) < 2 or not hasattr(self.llm_client, "classify_combined"):
+            return None
+        
+        try:
+            prompt = self._build_llm_batch_prompt([user_inputs[i] for i in indices], task_context)
+            responses = self.llm_client.classify_combined(prompt, len(indices))
+            if len(responses) != len(indices):
+                raise ValueError(f"expected {len(indices)} results, got {len(responses)}")
+            
+            results = ["UNKNOWN"] * len(user_inputs)
+            for i, response in zip(indices, responses):
+                status = response.get("status", "UNKNOWN")
+                if status not in VALID_STATUS_CODES:
+                    logger.warning(f"LLM returned invalid status '{status}', falling back to UNKNOWN")
+                    status = "UNKNOWN"
+                results[i] = status
         except Exception as e:
-            logger.error(f"Error during intent classification: {e}", exc_info=True)
-            # Fail gracefully by returning UNKNOWN
-            return "UNKNOWN"
+            logger.error(f"LLM batch classification failed: {e}, classifying inputs individually")
+            return None
+        
+        logger.info(f"LLM batch classified {len(indices)} inputs")
+        return results
     
     def extract_stage_info(self, user_input: str, task_context: Optional[Dict] = None) -> Optional[str]:
         """
@@ -160,25 +361,43 @@ class ClassificationEngine:
             user_input: User's text input
             task_context: Optional task context
             
+        Returns:
+            Stage name if found, None otherwise
+        """
+        try:
+            normalized_input = user_input.lower() if user_input else user_input
+        except Exception as e:
+            logger.error(f"Error extracting stage info: {e}", exc_info=True)
+            return None
+        
+        return self._extract_stage_from_normalized(normalized_input, task_context)
+    
+    def _extract_stage_from_normalized(self, normalized_input: str, task_context: Optional[Dict] = None) -> Optional[str]:
+        """
+        Extract current stage information from already lower-cased input or context.
+        
+        Args:
+            normalized_input: Lower-cased user input
+            task_context: Optional task context
+            
         Returns:
             Stage name if found, None otherwise
         """
         try:
             # Try to extract stage from user input first
             # Look for patterns like "at stage X" or "stage X"
-            if user_input:
-                stage_pattern = r'(?:at\s+)?stage\s+(\w+)'
-                match = re.search(stage_pattern, user_input.lower())
+            if normalized_input:
+                match = _STAGE_PATTERN.search(normalized_input)
                 if match:
                     stage_name = match.group(1)
-                    logger.debug(f"Extracted stage from user input: {stage_name}")
+                    logger.debug("Extracted stage from user input: %s", stage_name)
                     return stage_name
             
             # Fall back to task context if available
             if task_context and isinstance(task_context, dict):
                 if "current_stage" in task_context:
                     stage_name = task_context["current_stage"]
-                    logger.debug(f"Using stage from task context: {stage_name}")
+                    logger.debug("Using stage from task context: %s", stage_name)
                     return stage_name
             
             logger.debug("No stage information found")
@@ -215,7 +434,7 @@ class ClassificationEngine:
             
             first_stage = stages[0].get("stage") if isinstance(stages[0], dict) else None
             is_first = first_stage == current_stage
-            logger.debug(f"Is at first stage: {is_first} (current: {current_stage}, first: {first_stage})")
+            logger.debug("Is at first stage: %s (current: %s, first: %s)", is_first, current_stage, first_stage)
             return is_first
             
         except Exception as e:
@@ -249,7 +468,7 @@ class ClassificationEngine:
             
             last_stage = stages[-1].get("stage") if isinstance(stages[-1], dict) else None
             is_last = last_stage == current_stage
-            logger.debug(f"Is at last stage: {is_last} (current: {current_stage}, last: {last_stage})")
+            logger.debug("Is at last stage: %s (current: %s, last: %s)", is_last, current_stage, last_stage)
             return is_last
             
         except Exception as e:
@@ -270,65 +489,95 @@ class ClassificationEngine:
             Formatted prompt string for LLM
         """
         try:
-            # Start with base instructions
-            prompt = """You are a task navigation assistant. Classify the user's intent into one of these status codes:
-
-- NEXT: User wants to proceed to the next stage
-- PREVIOUS: User wants to go back to the previous stage
-- EXIT: User wants to quit or leave the task
-- HELP: User needs assistance or information
-- CARE: User expresses concern, emotion, or needs support
-- HELLO: User is greeting or introducing themselves
-- UNKNOWN: Intent is unclear or doesn't match other categories
-
-"""
-            
-            # Add task context if available
-            if task_context and isinstance(task_context, dict):
-                prompt += "Task Context:\n"
-                
-                # Add task name
-                if "task" in task_context:
-                    prompt += f"- Task: {task_context['task']}\n"
-                
-                # Add task description
-                if "description" in task_context:
-                    prompt += f"- Description: {task_context['description']}\n"
-                
-                # Extract and add current stage information
-                current_stage = self.extract_stage_info(user_input, task_context)
-                if current_stage:
-                    prompt += f"- Current Stage: {current_stage}\n"
-                    
-                    # Add stage description if available
-                    if "stages" in task_context and isinstance(task_context["stages"], list):
-                        for stage in task_context["stages"]:
-                            if isinstance(stage, dict) and stage.get("stage") == current_stage:
-                                if "description" in stage:
-                                    prompt += f"  ({stage['description']})\n"
-                                break
-                        
-                        # Add stage position information
-                        if self.is_at_first_stage(task_context, current_stage):
-                            prompt += "- Stage Position: First stage (cannot go back)\n"
-                        elif self.is_at_last_stage(task_context, current_stage):
-                            prompt += "- Stage Position: Last stage (cannot go forward)\n"
-                        else:
-                            prompt += "- Stage Position: Middle stage\n"
-                
-                prompt += "\n"
+            prompt = "".join((
+                # Base instructions unless the client already sends them
+                self._prompt_instructions(),
+                # Task context if available
+                self._build_prompt_context(user_input, task_context),
+                f'User Input: "{user_input}"\n\n',
+                _RESPONSE_FORMAT,
+            ))
             
-            # Add user input
-            prompt += f'User Input: "{user_input}"\n\n'
-            
-            # Add response format instructions
-            prompt += "Respond with ONLY the status code (one word) followed by a brief explanation.\n"
-            prompt += "Format: STATUS_CODE: explanation"
-            
-            logger.debug(f"Built LLM prompt with {len(prompt)} characters")
+            logger.debug("Built LLM prompt with %d characters", len(prompt))
             return prompt
             
         except Exception as e:
             logger.error(f"Error building LLM prompt: {e}", exc_info=True)
             # Return a minimal prompt if there's an error
             return f'Classify this user input into one of: NEXT, PREVIOUS, EXIT, HELP, CARE, HELLO, UNKNOWN\n\nUser Input: "{user_input}"\n\nRespond with: STATUS_CODE: explanation'
+    
+    def _build_llm_batch_prompt(self, user_inputs: List[str], task_context: Optional[Dict] = None) -> str:
+        """
+        Build a single prompt asking the LLM to classify several inputs.
+        
+        Stage information comes from the task context only, since it is
+        shared by every input in the batch.
+        
+        Args:
+            user_inputs: List of user text inputs
+            task_context: Optional task context with stages
+            
+        Returns:
+            Formatted prompt string requesting a JSON array response
+        """
+        prompt = "".join((
+            self._prompt_instructions(),
+            self._build_prompt_context(None, task_context),
+            f"User Inputs (JSON array):\n{json.dumps(user_inputs, ensure_ascii=False)}\n\n",
+            _BATCH_RESPONSE_FORMAT,
+        ))
+        
+        logger.debug("Built LLM batch prompt for %d inputs", len(user_inputs))
+        return prompt
+    
+    def _prompt_instructions(self) -> str:
+        """Return the instruction prefix for a per-call prompt."""
+        return "" if self._system_prompt_frozen else _PROMPT_INSTRUCTIONS
+    
+    def _build_prompt_context(self, user_input: Optional[str], task_context: Optional[Dict]) -> str:
+        """
+        Build the task context section of an LLM prompt.
+        
+        Args:
+            user_input: User's text input, used to extract the current stage
+            task_context: Optional task context with stages
+            
+        Returns:
+            Task context section, or an empty string without context
+        """
+        if not task_context or not isinstance(task_context, dict):
+            return ""
+        
+        parts = ["Task Context:\n"]
+        
+        # Add task name
+        if "task" in task_context:
+            parts.append(f"- Task: {task_context['task']}\n")
+        
+        # Add task description
+        if "description" in task_context:
+            parts.append(f"- Description: {task_context['description']}\n")
+        
+        # Extract and add current stage information
+        current_stage = self.extract_stage_info(user_input, task_context)
+        if current_stage:
+            parts.append(f"- Current Stage: {current_stage}\n")
+            
+            # Add stage description if available
+            if "stages" in task_context and isinstance(task_context["stages"], list):
+                for stage in task_context["stages"]:
+                    if isinstance(stage, dict) and stage.get("stage") == current_stage:
+                        if "description" in stage:
+                            parts.append(f"  ({stage['description']})\n")
+                        break
+                
+                # Add stage position information
+                if self.is_at_first_stage(task_context, current_stage):
+                    parts.append("- Stage Position: First stage (cannot go back)\n")
+                elif self.is_at_last_stage(task_context, current_stage):
+                    parts.append("- Stage Position: Last stage (cannot go forward)\n")
+                else:
+                    parts.append("- Stage Position: Middle stage\n")
+        
+        parts.append("\n")
+        return "".join(parts)
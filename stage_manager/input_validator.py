@@ -4,13 +4,16 @@ import json
 import logging
 from typing import Dict, Any, Optional
 
+from . import _json
+
 
 # Configure logger for this module
 logger = logging.getLogger(__name__)
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+
+
+# Required fields for task contexts and their stages
+_REQUIRED_CONTEXT_FIELDS = ("task", "description", "status", "stages")
+_REQUIRED_STAGE_FIELDS = ("stage", "description", "timeout")
 
 
 class InputValidator:
@@ -21,6 +24,8 @@ class InputValidator:
     and task context JSON structures according to the requirements.
     """
     
+    __slots__ = ()
+    
     @staticmethod
     def validate_user_input(user_input: str) -> bool:
         """
@@ -35,26 +40,34 @@ class InputValidator:
             
         Requirements: 1.1, 1.2
         """
-        try:
-            if user_input is None:
-                logger.warning("User input is None")
-                return False
-            
-            if not isinstance(user_input, str):
-                logger.warning(f"User input is not a string, got type: {type(user_input)}")
-                return False
-            
-            # Check if string is empty or contains only whitespace
-            if not user_input or user_input.isspace():
-                logger.warning("User input is empty or whitespace-only")
-                return False
-            
-            logger.debug(f"User input validated successfully: '{user_input[:50]}...'")
+        # Valid input takes a single check; the branches below only explain rejections
+        if isinstance(user_input, str) and user_input and not user_input.isspace():
+            logger.debug("User input validated successfully: '%.50s...'", user_input)
             return True
+        
+        if user_input is None:
+            logger.warning("User input is None")
+        elif not isinstance(user_input, str):
+            logger.warning(f"User input is not a string, got type: {type(user_input)}")
+        else:
+            logger.warning("User input is empty or whitespace-only")
+        return False
+    
+    @staticmethod
+    def normalize_input(user_input: str) -> str:
+        """
+        Normalize user input for pattern matching.
+        
+        Lower-cases and strips surrounding whitespace. Classification calls
+        this once per input and hands the result to every matcher.
+        
+        Args:
+            user_input: User's text input string
             
-        except Exception as e:
-            logger.error(f"Unexpected error during user input validation: {e}", exc_info=True)
-            return False
+        Returns:
+            Normalized input string
+        """
+        return user_input.lower().strip()
     
     @staticmethod
     def validate_task_context(task_context: Dict[str, Any]) -> bool:
@@ -80,8 +93,7 @@ class InputValidator:
                 return False
             
             # Check for required top-level fields
-            required_fields = ["task", "description", "status", "stages"]
-            for field in required_fields:
+            for field in _REQUIRED_CONTEXT_FIELDS:
                 if field not in task_context:
                     logger.warning(f"Task context missing required field: {field}")
                     return False
@@ -97,8 +109,7 @@ class InputValidator:
                     logger.warning(f"Stage at index {idx} is not a dictionary, got type: {type(stage)}")
                     return False
                 
-                stage_required_fields = ["stage", "description", "timeout"]
-                for field in stage_required_fields:
+                for field in _REQUIRED_STAGE_FIELDS:
                     if field not in stage:
                         logger.warning(f"Stage at index {idx} missing required field: {field}")
                         return False
@@ -113,7 +124,7 @@ class InputValidator:
                     logger.warning(f"Stage at index {idx} has negative timeout: {stage['timeout']}")
                     return False
             
-            logger.debug(f"Task context validated successfully for task: {task_context.get('task')}")
+            logger.debug("Task context validated successfully for task: %s", task_context.get('task'))
             return True
             
         except Exception as e:
@@ -149,7 +160,7 @@ class InputValidator:
                 logger.warning("Task JSON is empty or whitespace-only")
                 return None
             
-            parsed = json.loads(task_json)
+            parsed = _json.loads(task_json)
             logger.debug("Task context JSON parsed successfully")
             return parsed
             
@@ -1,19 +1,55 @@
 """LLM Client for classification using Large Language Models."""
 
+import hashlib
 import logging
+import random
+import threading
 import time
 import json
 import re
-from typing import Dict, Optional, Any
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
 from urllib.parse import urlparse
 
 import boto3
-from botocore.exceptions import ClientError, BotoCoreError
+from botocore.exceptions import ClientError, BotoCoreError, ConnectTimeoutError, ReadTimeoutError
 import requests
+from requests.adapters import HTTPAdapter
+
+from . import _json
+from .models import VALID_STATUS_CODES
 
 
 logger = logging.getLogger(__name__)
 
+# System prompt used until a caller provides its own via set_system_prompt()
+DEFAULT_SYSTEM_PROMPT = "You are a task navigation assistant."
+
+# "STATUS: message" text response format
+_STATUS_MESSAGE_PATTERN = re.compile(r'^([A-Z]+)\s*:\s*(.+)$', re.DOTALL)
+
+# Leading "STATUS:" of a streamed response, enough to decide the classification
+_STATUS_PREFIX_PATTERN = re.compile(r'\s*([A-Z]+)\s*:')
+
+# Endpoint host fragments identifying a provider, checked in order
+_ENDPOINT_HOST_PROVIDERS = (
+    ("amazonaws.com", "bedrock"),
+    ("bedrock", "bedrock"),
+    ("anthropic", "anthropic"),
+    ("openai", "openai"),
+)
+
+# Fixed generation settings for Bedrock requests
+# Note: Claude models don't allow both temperature and topP
+_CONVERSE_INFERENCE_CONFIG = {"maxTokens": 150, "temperature": 0.3}
+_BEDROCK_ANTHROPIC_PARAMS = {"max_tokens_to_sample": 150, "temperature": 0.3, "top_p": 0.9}
+_BEDROCK_TITAN_GENERATION_CONFIG = {"maxTokenCount": 150, "temperature": 0.3, "topP": 0.9}
+_BEDROCK_GENERIC_PARAMS = {"max_tokens": 150, "temperature": 0.3}
+
+# Bedrock models that support prompt caching checkpoints in the Converse API
+_BEDROCK_PROMPT_CACHE_MODELS = ("claude-3-5-haiku", "claude-3-7-sonnet", "sonnet-4", "opus-4", "haiku-4")
+
 
 class LLMConnectionError(Exception):
     """Raised when connection to LLM service fails."""
@@ -38,8 +74,52 @@ class LLMClient:
     Implements retry logic with exponential backoff for resilience.
     """
     
-    # Valid status codes that can be returned
-    VALID_STATUS_CODES = {"NEXT", "PREVIOUS", "EXIT", "HELP", "CARE", "HELLO", "UNKNOWN"}
+    __slots__ = (
+        "api_key",
+        "model",
+        "endpoint",
+        "timeout",
+        "max_retries",
+        "retry_delay",
+        "region",
+        "provider",
+        "system_prompt",
+        "_custom_system_prompt",
+        "_converse_system",
+        "_anthropic_system",
+        "_available",
+        "_available_until",
+        "_availability_lock",
+        "_availability_probing",
+        "_bedrock_client",
+        "_bedrock_api",
+        "_response_cache",
+        "_response_cache_lock",
+        "_status_cache",
+        "_api_call",
+        "_transport_errors",
+        "_session",
+        "_headers",
+        # Keep a per-instance __dict__ so callers can still set or patch
+        # their own attributes; the hot attributes above stay in slots
+        "__dict__",
+    )
+    
+    # Valid status codes that can be returned (shared with the rest of the package)
+    VALID_STATUS_CODES = VALID_STATUS_CODES
+    
+    # Number of classify() results kept in memory; 0 disables the cache
+    RESPONSE_CACHE_SIZE = 1024
+    
+    # Upper bound on requests classify_concurrently() keeps in flight
+    MAX_CONCURRENT_REQUESTS = 8
+    
+    # Seconds to trust a cached availability check
+    AVAILABLE_TTL = 60.0
+    UNAVAILABLE_TTL = 5.0
+    
+    # Model ID prefixes that identify AWS Bedrock models
+    _BEDROCK_MODEL_PROVIDERS = ("anthropic", "amazon", "ai21", "cohere", "meta")
     
     def __init__(
         self,
@@ -76,14 +156,61 @@ class LLMClient:
         self.max_retries = max_retries
         self.retry_delay = retry_delay
         self.region = region or "us-east-1"
-        self._available = None  # Cache availability status
+        self._available = None  # Cached availability status
+        self._available_until = 0.0  # time.monotonic() deadline for the cached status
+        self._availability_lock = threading.Lock()
+        self._availability_probing = False  # True while a thread runs the check
         self._bedrock_client = None
         
+        # LRU of parsed classify() results keyed by a digest of model and prompts
+        self._response_cache: "OrderedDict[bytes, Dict[str, str]]" = OrderedDict()
+        # Statuses from streamed classify_status() calls, whose messages are
+        # truncated; kept apart so classify() never returns a partial answer
+        self._status_cache: "OrderedDict[bytes, str]" = OrderedDict()
+        self._response_cache_lock = threading.Lock()
+        
+        # Render the default system blocks; only custom prompts are sent to
+        # providers that had no system prompt before
+        self.set_system_prompt(DEFAULT_SYSTEM_PROMPT)
+        self._custom_system_prompt = False
+        
         # Determine provider from model name or endpoint
         self.provider = self._detect_provider()
+        self._api_call = {
+            "bedrock": self._call_bedrock,
+            "openai": self._call_openai,
+            "anthropic": self._call_anthropic,
+        }.get(self.provider, self._call_custom)
+        
+        # Transport exceptions this provider can raise: (timeouts, connection
+        # errors, message prefix); _make_api_call only checks these
+        if self.provider == "bedrock":
+            self._transport_errors = (
+                (ConnectTimeoutError, ReadTimeoutError),
+                (ClientError, BotoCoreError),
+                "AWS Bedrock error",
+            )
+        else:
+            self._transport_errors = (
+                (requests.exceptions.Timeout,),
+                (requests.exceptions.ConnectionError,),
+                "Failed to connect to LLM service",
+            )
+        
+        # HTTP providers reuse pooled keep-alive connections and fixed headers
+        self._session = None
+        self._headers = None
+        if self.provider != "bedrock":
+            self._session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=0)
+            self._session.mount("https://", adapter)
+            self._session.mount("http://", adapter)
+            self._headers = self._build_headers()
         
         # Initialize Bedrock client if needed
+        self._bedrock_api = None
         if self.provider == "bedrock":
+            self._bedrock_api = self._detect_bedrock_api()
             self._init_bedrock_client()
         
         logger.info(
@@ -99,20 +226,19 @@ class LLMClient:
             Provider name: "openai", "anthropic", "bedrock", or "custom"
         """
         if self.endpoint:
-            # Custom endpoint
-            if "bedrock" in self.endpoint.lower() or "amazonaws.com" in self.endpoint.lower():
-                return "bedrock"
-            elif "anthropic" in self.endpoint.lower():
-                return "anthropic"
-            elif "openai" in self.endpoint.lower():
-                return "openai"
+            # Custom endpoint: only the host decides, so a path that happens to
+            # mention a provider doesn't change the request format
+            host = urlparse(self.endpoint).hostname or self.endpoint.lower()
+            for fragment, provider in _ENDPOINT_HOST_PROVIDERS:
+                if fragment in host:
+                    return provider
             return "custom"
         
         # Detect from model name
         model_lower = self.model.lower()
         
         # AWS Bedrock model IDs typically have format: provider.model-name
-        if "." in model_lower and any(provider in model_lower for provider in ["anthropic", "amazon", "ai21", "cohere", "meta"]):
+        if "." in model_lower and any(provider in model_lower for provider in self._BEDROCK_MODEL_PROVIDERS):
             return "bedrock"
         elif "gpt" in model_lower or "davinci" in model_lower:
             return "openai"
@@ -121,6 +247,51 @@ class LLMClient:
         
         return "custom"
     
+    def _detect_bedrock_api(self) -> str:
+        """
+        Detect which Bedrock API and request format the model uses.
+        
+        Returns:
+            "converse" for Claude 3+ models, otherwise the InvokeModel body
+            format: "anthropic", "amazon", or "generic"
+        """
+        model_lower = self.model.lower()
+        
+        # Claude 3+ models include: claude-3-opus, claude-3-sonnet, claude-3-haiku, claude-3-5-sonnet, etc.
+        if "anthropic" in model_lower and (
+            "claude-3" in model_lower or "sonnet-4" in model_lower or "opus-4" in model_lower
+        ):
+            return "converse"
+        elif "anthropic" in model_lower:
+            return "anthropic"
+        elif "amazon" in model_lower:
+            return "amazon"
+        return "generic"
+    
+    def _build_headers(self) -> Dict[str, str]:
+        """
+        Build the request headers for the HTTP provider.
+        
+        Returns:
+            Headers dictionary reused for every request
+        """
+        if self.provider == "anthropic":
+            return {
+                "x-api-key": self.api_key,
+                "anthropic-version": "2023-06-01",
+                "Content-Type": "application/json"
+            }
+        
+        return {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json"
+        }
+    
+    def close(self):
+        """Close pooled HTTP connections held by this client."""
+        if self._session is not None:
+            self._session.close()
+    
     def _init_bedrock_client(self):
         """Initialize AWS Bedrock client."""
         try:
@@ -144,6 +315,35 @@ class LLMClient:
             logger.error(f"Failed to initialize Bedrock client: {e}")
             raise LLMConnectionError(f"Failed to initialize AWS Bedrock client: {e}")
     
+    def set_system_prompt(self, system_prompt: str):
+        """
+        Set the fixed system prompt sent with every request.
+        
+        The provider-specific system blocks are rendered once here so each
+        call only sends the per-request prompt. On Bedrock models that support
+        it, the system block is followed by a cache checkpoint so the fixed
+        prefix is served from the prompt cache.
+        
+        Args:
+            system_prompt: Instructions that stay the same across requests
+        """
+        self.system_prompt = system_prompt
+        self._custom_system_prompt = True
+        
+        self._converse_system = [{"text": system_prompt}]
+        if any(name in self.model.lower() for name in _BEDROCK_PROMPT_CACHE_MODELS):
+            self._converse_system.append({"cachePoint": {"type": "default"}})
+        
+        self._anthropic_system = [
+            {"type": "text", "text": system_prompt, "cache_control": {"type": "ephemeral"}}
+        ]
+    
+    def _with_inline_system_prompt(self, prompt: str) -> str:
+        """Prepend a custom system prompt for APIs that only take a single prompt."""
+        if self._custom_system_prompt:
+            return f"{self.system_prompt}\n\n{prompt}"
+        return prompt
+    
     def classify(self, prompt: str) -> Dict[str, str]:
         """
         Send classification request to LLM with retry logic.
@@ -154,25 +354,215 @@ class LLMClient:
         Returns:
             Dictionary with 'status' and 'message' keys
             
+        Raises:
+            LLMConnectionError: If connection to LLM service fails after retries
+            LLMTimeoutError: If request times out after retries
+            LLMResponseError: If response is invalid or unparseable
+        """
+        key = self._response_cache_key(prompt)
+        cached = self._get_cached_response(key)
+        if cached is not None:
+            logger.debug("LLM classification served from cache")
+            return cached
+        
+        result = self._request_with_retries(prompt, self._parse_response)
+        logger.info(f"LLM classification successful: status={result['status']}")
+        # Unparseable answers may be transient, so only keep real classifications
+        if result["status"] != "UNKNOWN":
+            self._store_cached_response(key, result)
+        return result
+    
+    def _response_cache_key(self, prompt: str) -> bytes:
+        """
+        Build the response cache key for a prompt.
+        
+        The system prompt is part of the key since it changes the answer.
+        
+        Args:
+            prompt: The prompt to send
+            
+        Returns:
+            16-byte BLAKE2b digest of model, system prompt and prompt
+        """
+        return hashlib.blake2b(
+            f"{self.model}\x00{self.system_prompt}\x00{prompt}".encode("utf-8", "surrogatepass"),
+            digest_size=16
+        ).digest()
+    
+    def _get_cached_response(self, key: bytes) -> Optional[Dict[str, str]]:
+        """Return a copy of a cached classify() result, or None on a miss."""
+        with self._response_cache_lock:
+            result = self._response_cache.get(key)
+            if result is None:
+                return None
+            self._response_cache.move_to_end(key)
+        return dict(result)
+    
+    def _store_cached_response(self, key: bytes, result: Dict[str, str]):
+        """Cache a classify() result, evicting the least recently used entries."""
+        if self.RESPONSE_CACHE_SIZE <= 0:
+            return
+        with self._response_cache_lock:
+            self._response_cache[key] = dict(result)
+            self._response_cache.move_to_end(key)
+            while len(self._response_cache) > self.RESPONSE_CACHE_SIZE:
+                self._response_cache.popitem(last=False)
+    
+    def _get_cached_status(self, key: bytes) -> Optional[str]:
+        """Return a status cached by classify_status(), or None on a miss."""
+        with self._response_cache_lock:
+            status = self._status_cache.get(key)
+            if status is not None:
+                self._status_cache.move_to_end(key)
+            return status
+    
+    def _store_cached_status(self, key: bytes, status: str):
+        """Cache a classify_status() result, evicting the least recently used entries."""
+        if self.RESPONSE_CACHE_SIZE <= 0:
+            return
+        with self._response_cache_lock:
+            self._status_cache[key] = status
+            self._status_cache.move_to_end(key)
+            while len(self._status_cache) > self.RESPONSE_CACHE_SIZE:
+                self._status_cache.popitem(last=False)
+    
+    def classify_combined(self, prompt: str, expected_count: int) -> List[Dict[str, str]]:
+        """
+        Send one combined classification request covering several inputs.
+        
+        The prompt must ask for a JSON array with one status/message object
+        per input, so a whole list of inputs costs a single round-trip.
+        
+        Args:
+            prompt: The constructed batch prompt for classification
+            expected_count: Number of inputs the prompt asks to classify
+            
+        Returns:
+            List of dictionaries with 'status' and 'message' keys, in input order
+            
+        Raises:
+            LLMConnectionError: If connection to LLM service fails after retries
+            LLMTimeoutError: If request times out after retries
+            LLMResponseError: If response is not a JSON array of the expected length
+        """
+        results = self._request_with_retries(
+            prompt, lambda response: self._parse_batch_response(response, expected_count)
+        )
+        logger.info(f"LLM batch classification successful: {len(results)} results")
+        return results
+    
+    def classify_concurrently(self, prompts: List[str]) -> List[Dict[str, str]]:
+        """
+        Send several independent classification requests concurrently.
+        
+        Each prompt is classified as by classify(), but up to
+        MAX_CONCURRENT_REQUESTS requests are in flight at once, so the
+        wall-clock cost is close to the slowest request rather than the sum.
+        A prompt whose request fails gets an UNKNOWN result carrying the
+        error, so one failure doesn't discard the other answers.
+        
+        Args:
+            prompts: The constructed prompts for classification
+            
+        Returns:
+            List of dictionaries with 'status' and 'message' keys, in prompt order
+        """
+        if len(prompts) < 2:
+            return [self._classify_or_unknown(prompt) for prompt in prompts]
+        
+        # Network I/O releases the GIL for both requests and boto3 calls
+        workers = min(len(prompts), self.MAX_CONCURRENT_REQUESTS)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(self._classify_or_unknown, prompts))
+    
+    def _classify_or_unknown(self, prompt: str) -> Dict[str, str]:
+        """Classify a prompt, turning LLM errors into an UNKNOWN result."""
+        try:
+            return self.classify(prompt)
+        except (LLMConnectionError, LLMTimeoutError, LLMResponseError) as e:
+            logger.warning(f"LLM classification failed: {e}")
+            return {"status": "UNKNOWN", "message": f"LLM error: {e}"}
+    
+    def classify_status(self, prompt: str) -> str:
+        """
+        Send classification request to LLM and return only the status code.
+        
+        For Bedrock models on the Converse API the response is streamed and
+        the stream is abandoned as soon as the leading "STATUS:" arrives, so
+        callers that ignore the message don't wait for the rest of the
+        generation. Streamed statuses are cached apart from classify()
+        results, since their messages are cut short. Other providers fall
+        back to classify().
+        
+        Args:
+            prompt: The constructed prompt for classification
+            
+        Returns:
+            Status code string
+            
+        Raises:
+            LLMConnectionError: If connection to LLM service fails after retries
+            LLMTimeoutError: If request times out after retries
+            LLMResponseError: If response is invalid or unparseable
+        """
+        if self._bedrock_api != "converse":
+            return self.classify(prompt)["status"]
+        
+        # A full answer cached by classify() also answers this
+        key = self._response_cache_key(prompt)
+        cached = self._get_cached_response(key)
+        if cached is not None:
+            return cached["status"]
+        status = self._get_cached_status(key)
+        if status is not None:
+            logger.debug("LLM classification served from cache")
+            return status
+        
+        result = self._request_with_retries(
+            prompt, self._parse_response, api_call=self._stream_bedrock_status
+        )
+        logger.info(f"LLM classification successful: status={result['status']}")
+        # Unparseable answers may be transient, so only keep real classifications
+        if result["status"] != "UNKNOWN":
+            self._store_cached_status(key, result["status"])
+        return result["status"]
+    
+    def _request_with_retries(
+        self,
+        prompt: str,
+        parse: Callable[[str], Any],
+        timeout: Optional[float] = None,
+        api_call: Optional[Callable[[str, float], str]] = None
+    ) -> Any:
+        """
+        Call the LLM and parse its response, retrying connection failures.
+        
+        Args:
+            prompt: The prompt to send
+            parse: Callable turning the raw response into the returned value
+            timeout: Optional per-request timeout overriding self.timeout
+            api_call: Optional provider call overriding the one bound in __init__
+            
+        Returns:
+            The parsed response
+            
         Raises:
             LLMConnectionError: If connection to LLM service fails after retries
             LLMTimeoutError: If request times out after retries
             LLMResponseError: If response is invalid or unparseable
         """
         last_exception = None
+        last_attempt = self.max_retries - 1
         
         for attempt in range(self.max_retries):
             try:
-                logger.debug(f"LLM classification attempt {attempt + 1}/{self.max_retries}")
+                logger.debug("LLM classification attempt %d/%d", attempt + 1, self.max_retries)
                 
                 # Make the actual API call
-                response = self._make_api_call(prompt)
+                response = self._make_api_call(prompt, timeout, api_call)
                 
                 # Parse and validate the response
-                result = self._parse_response(response)
-                
-                logger.info(f"LLM classification successful: status={result['status']}")
-                return result
+                return parse(response)
                 
             except (LLMConnectionError, LLMTimeoutError) as e:
                 last_exception = e
@@ -181,10 +571,11 @@ class LLMClient:
                 )
                 
                 # Don't retry on the last attempt
-                if attempt < self.max_retries - 1:
-                    # Exponential backoff
-                    delay = self.retry_delay * (2 ** attempt)
-                    logger.debug(f"Retrying in {delay} seconds...")
+                if attempt < last_attempt:
+                    # Exponential backoff, jittered to 50-150% so clients that
+                    # failed together don't retry in lockstep
+                    delay = self.retry_delay * (1 << attempt) * (0.5 + random.random())
+                    logger.debug("Retrying in %.2f seconds...", delay)
                     time.sleep(delay)
                 else:
                     logger.error(f"All {self.max_retries} retry attempts failed")
@@ -200,12 +591,19 @@ class LLMClient:
             raise last_exception
         raise LLMConnectionError("Failed to classify after all retries")
     
-    def _make_api_call(self, prompt: str) -> str:
+    def _make_api_call(
+        self,
+        prompt: str,
+        timeout: Optional[float] = None,
+        api_call: Optional[Callable[[str, float], str]] = None
+    ) -> str:
         """
         Make the actual API call to the LLM service.
         
         Args:
             prompt: The prompt to send
+            timeout: Optional per-request timeout overriding self.timeout
+            api_call: Optional provider call overriding the one bound in __init__
             
         Returns:
             Raw response text from the LLM
@@ -214,51 +612,44 @@ class LLMClient:
             LLMConnectionError: If connection fails
             LLMTimeoutError: If request times out
         """
-        logger.debug(f"Making API call to {self.provider} with model {self.model}")
+        logger.debug("Making API call to %s with model %s", self.provider, self.model)
+        
+        timeout = timeout or self.timeout
+        timeout_errors, connection_errors, error_prefix = self._transport_errors
         
         try:
-            if self.provider == "bedrock":
-                return self._call_bedrock(prompt)
-            elif self.provider == "openai":
-                return self._call_openai(prompt)
-            elif self.provider == "anthropic":
-                return self._call_anthropic(prompt)
-            else:
-                return self._call_custom(prompt)
-                
+            return (api_call or self._api_call)(prompt, timeout)
+        
+        # Errors the provider call already mapped pass through unchanged
+        except (LLMConnectionError, LLMTimeoutError, LLMResponseError):
+            raise
+        
+        # Handle the provider's transport exceptions (requests or boto3)
+        except timeout_errors as e:
+            logger.error(f"API call timed out after {timeout}s")
+            raise LLMTimeoutError(f"Request timed out after {timeout} seconds") from e
+        except connection_errors as e:
+            logger.error(f"Connection error: {e}")
+            raise LLMConnectionError(f"{error_prefix}: {e}") from e
+        
         except Exception as e:
-            # Handle requests exceptions
-            if isinstance(e, requests.exceptions.Timeout):
-                logger.error(f"API call timed out after {self.timeout}s")
-                raise LLMTimeoutError(f"Request timed out after {self.timeout} seconds")
-            elif isinstance(e, requests.exceptions.ConnectionError):
-                logger.error(f"Connection error: {e}")
-                raise LLMConnectionError(f"Failed to connect to LLM service: {e}")
-            
-            # Handle boto3 exceptions
-            if isinstance(e, (ClientError, BotoCoreError)):
-                logger.error(f"AWS Bedrock error: {e}")
-                raise LLMConnectionError(f"AWS Bedrock error: {e}")
-            
             logger.error(f"API call failed: {e}")
-            raise LLMConnectionError(f"Failed to connect to LLM service: {e}")
+            raise LLMConnectionError(f"Failed to connect to LLM service: {e}") from e
     
-    def _call_bedrock(self, prompt: str) -> str:
-        """Call AWS Bedrock API using Converse API (Messages API) or legacy InvokeModel API."""
+    def _call_bedrock(self, prompt: str, timeout: float) -> str:
+        """
+        Call AWS Bedrock API using Converse API (Messages API) or legacy InvokeModel API.
+        
+        The timeout is governed by the boto3 client configuration, not per request.
+        """
         if not self._bedrock_client:
             raise LLMConnectionError("Bedrock client not initialized")
         
         try:
-            # Check if this is a Claude 3+ model that requires Converse API
-            # Claude 3+ models include: claude-3-opus, claude-3-sonnet, claude-3-haiku, claude-3-5-sonnet, etc.
-            uses_converse_api = (
-                "anthropic" in self.model.lower() and 
-                ("claude-3" in self.model.lower() or "sonnet-4" in self.model.lower() or "opus-4" in self.model.lower())
-            )
-            
-            if uses_converse_api:
+            # Claude 3+ models require the Converse API (detected once in __init__)
+            if self._bedrock_api == "converse":
                 # Use Converse API for Claude 3+ models
-                logger.debug(f"Using Converse API for model: {self.model}")
+                logger.debug("Using Converse API for model: %s", self.model)
                 response = self._bedrock_client.converse(
                     modelId=self.model,
                     messages=[
@@ -267,12 +658,8 @@ class LLMClient:
                             "content": [{"text": prompt}]
                         }
                     ],
-                    system=[{"text": "You are a task navigation assistant."}],
-                    inferenceConfig={
-                        "maxTokens": 150,
-                        "temperature": 0.3
-                        # Note: Claude models don't allow both temperature and topP
-                    }
+                    system=self._converse_system,
+                    inferenceConfig=_CONVERSE_INFERENCE_CONFIG
                 )
                 
                 # Extract text from Converse API response
@@ -283,37 +670,32 @@ class LLMClient:
                 if content and len(content) > 0:
                     return content[0].get("text", "")
                 
-                raise LLMResponseError(f"Could not extract text from Converse API response: {response}")
+                raise LLMResponseError(f"Could not extract text from Converse API response: {str(response)[:200]}")
             
             else:
                 # Use legacy InvokeModel API for older models
-                logger.debug(f"Using InvokeModel API for model: {self.model}")
+                logger.debug("Using InvokeModel API for model: %s", self.model)
+                prompt = self._with_inline_system_prompt(prompt)
                 
-                # Prepare the request body based on model provider
-                if "anthropic" in self.model.lower():
+                # Prepare the request body based on model provider; only the
+                # prompt varies, the generation settings are module constants
+                if self._bedrock_api == "anthropic":
                     # Anthropic Claude 2 models on Bedrock (legacy format)
-                    body = json.dumps({
+                    body = _json.dumps({
                         "prompt": f"\n\nHuman: {prompt}\n\nAssistant:",
-                        "max_tokens_to_sample": 150,
-                        "temperature": 0.3,
-                        "top_p": 0.9,
+                        **_BEDROCK_ANTHROPIC_PARAMS,
                     })
-                elif "amazon" in self.model.lower():
+                elif self._bedrock_api == "amazon":
                     # Amazon Titan models
-                    body = json.dumps({
+                    body = _json.dumps({
                         "inputText": prompt,
-                        "textGenerationConfig": {
-                            "maxTokenCount": 150,
-                            "temperature": 0.3,
-                            "topP": 0.9,
-                        }
+                        "textGenerationConfig": _BEDROCK_TITAN_GENERATION_CONFIG,
                     })
                 else:
                     # Generic format
-                    body = json.dumps({
+                    body = _json.dumps({
                         "prompt": prompt,
-                        "max_tokens": 150,
-                        "temperature": 0.3,
+                        **_BEDROCK_GENERIC_PARAMS,
                     })
                 
                 # Invoke the model
@@ -325,21 +707,93 @@ class LLMClient:
                 )
                 
                 # Parse the response
-                response_body = json.loads(response['body'].read())
+                response_body = _json.loads(response['body'].read())
                 
                 # Extract text based on model provider
-                if "anthropic" in self.model.lower():
+                if self._bedrock_api == "anthropic":
                     return response_body.get("completion", "")
-                elif "amazon" in self.model.lower():
+                elif self._bedrock_api == "amazon":
                     results = response_body.get("results", [])
                     if results:
                         return results[0].get("outputText", "")
                 else:
                     # Try common response fields
-                    return response_body.get("text", response_body.get("completion", str(response_body)))
+                    text = response_body.get("text")
+                    if text is None:
+                        text = response_body.get("completion")
+                    if text is not None:
+                        return text
                 
-                raise LLMResponseError(f"Could not extract text from Bedrock response: {response_body}")
+                raise LLMResponseError(
+                    f"Could not extract text from Bedrock response: {str(response_body)[:200]}"
+                )
+            
+        except (ConnectTimeoutError, ReadTimeoutError, LLMResponseError):
+            raise
+        except ClientError as e:
+            error_code = e.response['Error']['Code']
+            error_message = e.response['Error']['Message']
+            logger.error(f"Bedrock ClientError: {error_code} - {error_message}")
+            raise LLMConnectionError(f"AWS Bedrock error: {error_code} - {error_message}")
+        except Exception as e:
+            logger.error(f"Bedrock API call failed: {e}")
+            raise LLMConnectionError(f"Failed to call AWS Bedrock: {e}")
+    
+    def _stream_bedrock_status(self, prompt: str, timeout: float) -> str:
+        """
+        Stream a Converse API response until its leading status code is known.
+        
+        The timeout is governed by the boto3 client configuration, not per request.
+        
+        Returns:
+            The streamed text up to and including "STATUS:", or the whole
+            response if it doesn't start with one (e.g. JSON output)
+        """
+        if not self._bedrock_client:
+            raise LLMConnectionError("Bedrock client not initialized")
+        
+        try:
+            logger.debug("Using ConverseStream API for model: %s", self.model)
+            response = self._bedrock_client.converse_stream(
+                modelId=self.model,
+                messages=[
+                    {
+                        "role": "user",
+                        "content": [{"text": prompt}]
+                    }
+                ],
+                system=self._converse_system,
+                inferenceConfig=_CONVERSE_INFERENCE_CONFIG
+            )
+            
+            stream = response["stream"]
+            chunks = []
+            try:
+                for event in stream:
+                    delta = event.get("contentBlockDelta")
+                    if delta is None:
+                        continue
+                    chunks.append(delta["delta"].get("text", ""))
+                    
+                    # The status is the first thing the model emits; stop reading once it's complete
+                    text = "".join(chunks)
+                    if _STATUS_PREFIX_PATTERN.match(text):
+                        return text
+            finally:
+                # Release the connection instead of draining the rest of the generation
+                close = getattr(stream, "close", None)
+                if close is not None:
+                    close()
             
+            if chunks:
+                return "".join(chunks)
+            
+            raise LLMResponseError("Could not extract text from ConverseStream API response")
+            
+        except LLMResponseError:
+            raise
+        except (ConnectTimeoutError, ReadTimeoutError):
+            raise
         except ClientError as e:
             error_code = e.response['Error']['Code']
             error_message = e.response['Error']['Message']
@@ -349,30 +803,25 @@ class LLMClient:
             logger.error(f"Bedrock API call failed: {e}")
             raise LLMConnectionError(f"Failed to call AWS Bedrock: {e}")
     
-    def _call_openai(self, prompt: str) -> str:
+    def _call_openai(self, prompt: str, timeout: float) -> str:
         """Call OpenAI API."""
         endpoint = self.endpoint or "https://api.openai.com/v1/chat/completions"
         
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
-        
         payload = {
             "model": self.model,
             "messages": [
-                {"role": "system", "content": "You are a task navigation assistant."},
+                {"role": "system", "content": self.system_prompt},
                 {"role": "user", "content": prompt}
             ],
             "temperature": 0.3,
             "max_tokens": 150
         }
         
-        response = requests.post(
+        response = self._session.post(
             endpoint,
-            headers=headers,
-            json=payload,
-            timeout=self.timeout
+            headers=self._headers,
+            data=_json.dumps(payload),
+            timeout=timeout
         )
         
         if response.status_code != 200:
@@ -383,16 +832,10 @@ class LLMClient:
         data = response.json()
         return data["choices"][0]["message"]["content"]
     
-    def _call_anthropic(self, prompt: str) -> str:
+    def _call_anthropic(self, prompt: str, timeout: float) -> str:
         """Call Anthropic API."""
         endpoint = self.endpoint or "https://api.anthropic.com/v1/messages"
         
-        headers = {
-            "x-api-key": self.api_key,
-            "anthropic-version": "2023-06-01",
-            "Content-Type": "application/json"
-        }
-        
         payload = {
             "model": self.model,
             "messages": [
@@ -401,12 +844,14 @@ class LLMClient:
             "max_tokens": 150,
             "temperature": 0.3
         }
+        if self._custom_system_prompt:
+            payload["system"] = self._anthropic_system
         
-        response = requests.post(
+        response = self._session.post(
             endpoint,
-            headers=headers,
-            json=payload,
-            timeout=self.timeout
+            headers=self._headers,
+            data=_json.dumps(payload),
+            timeout=timeout
         )
         
         if response.status_code != 200:
@@ -417,28 +862,23 @@ class LLMClient:
         data = response.json()
         return data["content"][0]["text"]
     
-    def _call_custom(self, prompt: str) -> str:
+    def _call_custom(self, prompt: str, timeout: float) -> str:
         """Call custom endpoint."""
         if not self.endpoint:
             raise LLMConnectionError("Custom endpoint not configured")
         
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
-        
         payload = {
             "model": self.model,
-            "prompt": prompt,
+            "prompt": self._with_inline_system_prompt(prompt),
             "max_tokens": 150,
             "temperature": 0.3
         }
         
-        response = requests.post(
+        response = self._session.post(
             self.endpoint,
-            headers=headers,
-            json=payload,
-            timeout=self.timeout
+            headers=self._headers,
+            data=_json.dumps(payload),
+            timeout=timeout
         )
         
         if response.status_code != 200:
@@ -478,24 +918,26 @@ class LLMClient:
         
         response = response.strip()
         
-        # Try to parse as JSON first
-        try:
-            data = json.loads(response)
-            if isinstance(data, dict) and "status" in data and "message" in data:
-                status = data["status"].upper()
-                message = data["message"]
-                
-                if status in self.VALID_STATUS_CODES:
-                    return {"status": status, "message": message}
-                else:
-                    logger.warning(f"Invalid status code in JSON response: {status}")
-                    return {"status": "UNKNOWN", "message": message}
-        except (json.JSONDecodeError, KeyError, AttributeError):
-            # Not JSON or invalid JSON, try text parsing
-            pass
+        # Try to parse as JSON first; only an object can carry status/message,
+        # so plain "STATUS: message" text skips the decoder and its exception
+        if response.startswith("{"):
+            try:
+                data = _json.loads(response)
+                if isinstance(data, dict) and "status" in data and "message" in data:
+                    status = data["status"].upper()
+                    message = data["message"]
+                    
+                    if status in self.VALID_STATUS_CODES:
+                        return {"status": status, "message": message}
+                    else:
+                        logger.warning(f"Invalid status code in JSON response: {status}")
+                        return {"status": "UNKNOWN", "message": message}
+            except (json.JSONDecodeError, KeyError, AttributeError):
+                # Invalid JSON, try text parsing
+                pass
         
         # Try to parse as "STATUS: message" format
-        match = re.match(r'^([A-Z]+)\s*:\s*(.+)$', response, re.DOTALL)
+        match = _STATUS_MESSAGE_PATTERN.match(response)
         if match:
             status = match.group(1).upper()
             message = match.group(2).strip()
@@ -506,13 +948,14 @@ class LLMClient:
                 logger.warning(f"Invalid status code in text response: {status}")
                 return {"status": "UNKNOWN", "message": message}
         
-        # Try to extract status code from the beginning of the response
-        words = response.split()
-        if words:
-            first_word = words[0].upper().rstrip(':,.')
+        # Try to extract status code from the beginning of the response;
+        # split off only the first word so non-matching text isn't tokenized
+        parts = response.split(None, 1)
+        if parts:
+            first_word = parts[0].upper().rstrip(':,.')
             if first_word in self.VALID_STATUS_CODES:
-                # Use first word as status, rest as message
-                message = ' '.join(words[1:]) if len(words) > 1 else response
+                # Use first word as status, rest (whitespace-normalized) as message
+                message = ' '.join(parts[1].split()) if len(parts) > 1 else response
                 return {"status": first_word, "message": message.strip()}
         
         # If we can't parse it, return UNKNOWN
@@ -522,44 +965,112 @@ class LLMClient:
             "message": f"Unable to parse LLM response: {response[:200]}"
         }
     
+    @classmethod
+    def _parse_batch_response(cls, response: str, expected_count: int) -> List[Dict[str, str]]:
+        """
+        Parse a batched LLM response into one status/message dict per input.
+        
+        Expected format: [{"status": "STATUS_CODE", "message": "message"}, ...],
+        optionally surrounded by extra text or code fences.
+        
+        Args:
+            response: Raw response from LLM
+            expected_count: Number of results the prompt asked for
+            
+        Returns:
+            List of dictionaries with 'status' and 'message' keys
+            
+        Raises:
+            LLMResponseError: If response is not a JSON array of the expected length
+        """
+        if not response or not isinstance(response, str):
+            raise LLMResponseError("Response is empty or not a string")
+        
+        start = response.find("[")
+        end = response.rfind("]")
+        if start == -1 or end < start:
+            raise LLMResponseError(f"No JSON array in batch response: {response[:100]}")
+        
+        try:
+            data = _json.loads(response[start:end + 1])
+        except json.JSONDecodeError as e:
+            raise LLMResponseError(f"Invalid JSON array in batch response: {e}")
+        
+        if not isinstance(data, list) or len(data) != expected_count:
+            raise LLMResponseError(
+                f"Expected {expected_count} results in batch response, got "
+                f"{len(data) if isinstance(data, list) else type(data).__name__}"
+            )
+        
+        results = []
+        for item in data:
+            if not isinstance(item, dict) or not isinstance(item.get("status"), str):
+                raise LLMResponseError(f"Invalid item in batch response: {item}")
+            
+            status = item["status"].upper()
+            message = str(item.get("message", ""))
+            if status not in cls.VALID_STATUS_CODES:
+                logger.warning(f"Invalid status code in batch response: {status}")
+                status = "UNKNOWN"
+            results.append({"status": status, "message": message})
+        
+        return results
+    
     def is_available(self) -> bool:
         """
         Check if LLM service is available.
         
-        Makes a lightweight test request to verify connectivity.
-        Caches the result to avoid repeated checks.
+        Makes a short test request to verify connectivity.
+        Caches the result for a while to avoid repeated checks: successes
+        for AVAILABLE_TTL seconds, failures only for UNAVAILABLE_TTL so a
+        transient outage doesn't mark the service down for good.
+        The lock only guards the cached value; the check itself, including
+        its retry delays, runs unlocked. While one thread is checking, others
+        get the previous result if there is one instead of starting another.
         
         Returns:
             True if service is available, False otherwise
         """
-        # Return cached result if available
-        if self._available is not None:
-            return self._available
+        with self._availability_lock:
+            # Return cached result if still fresh, or the stale one while
+            # another thread refreshes it
+            if time.monotonic() < self._available_until or (
+                self._availability_probing and self._available is not None
+            ):
+                return self._available
+            self._availability_probing = True
+        
+        # _check_availability() reports every failure as False rather than raising
+        available = self._check_availability()
+        
+        with self._availability_lock:
+            self._availability_probing = False
+            self._available = available
+            ttl = self.AVAILABLE_TTL if available else self.UNAVAILABLE_TTL
+            self._available_until = time.monotonic() + ttl
+        return available
+    
+    def _check_availability(self) -> bool:
+        """
+        Send a test request with a short timeout.
         
+        Returns:
+            True if the LLM answered, False otherwise
+        """
         try:
             logger.debug("Checking LLM service availability")
             
-            # Try a simple test request with minimal prompt
+            # Try a simple test request with minimal prompt and a shorter timeout;
+            # the timeout is passed per request so concurrent calls are unaffected
             test_prompt = "Test connection. Respond with: HELLO: Service available"
+            self._request_with_retries(test_prompt, self._parse_response, timeout=5)
             
-            # Use a shorter timeout for availability check
-            original_timeout = self.timeout
-            self.timeout = 5
-            
-            try:
-                result = self.classify(test_prompt)
-                self._available = True
-                logger.info("LLM service is available")
-            finally:
-                self.timeout = original_timeout
-            
+            logger.info("LLM service is available")
             return True
             
         except (LLMConnectionError, LLMTimeoutError, LLMResponseError) as e:
             logger.warning(f"LLM service is not available: {e}")
-            self._available = False
             return False
         except Exception as e:
             logger.error(f"Unexpected error checking LLM availability: {e}")
-            self._available = False
             return False
@@ -1,13 +1,25 @@
 """Data models for StageManager."""
 
-from dataclasses import dataclass, field, asdict
+from dataclasses import dataclass, field
 from typing import List, Dict, Any, Optional
 import json
+from json.encoder import encode_basestring_ascii
 import logging
+import sys
 
 
 logger = logging.getLogger(__name__)
 
+# Status codes a classification may produce
+VALID_STATUS_CODES = frozenset({"NEXT", "PREVIOUS", "EXIT", "HELP", "CARE", "HELLO", "UNKNOWN"})
+
+# Status codes a ClassificationResponse may carry: classifications plus ERROR
+VALID_RESPONSE_STATUS_CODES = VALID_STATUS_CODES | {"ERROR"}
+
+# A hand-written __slots__ conflicts with field(default_factory=...), so
+# dataclasses with such fields get slots from the decorator where supported
+_DATACLASS_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
 
 @dataclass
 class Stage:
@@ -19,6 +31,8 @@ class Stage:
         description: Stage description
         timeout: Timeout in seconds for the stage
     """
+    __slots__ = ("stage", "description", "timeout")
+    
     stage: str
     description: str
     timeout: int
@@ -46,10 +60,14 @@ class Stage:
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert stage to dictionary."""
-        return asdict(self)
+        return {
+            "stage": self.stage,
+            "description": self.description,
+            "timeout": self.timeout
+        }
 
 
-@dataclass
+@dataclass(**_DATACLASS_SLOTS)
 class TaskContext:
     """
     Represents the context of a task with multiple stages.
@@ -106,7 +124,11 @@ class TaskContext:
             "task": self.task,
             "description": self.description,
             "status": self.status,
-            "stages": [stage.to_dict() for stage in self.stages]
+            # Same literal as Stage.to_dict, inlined to skip a method call per stage
+            "stages": [
+                {"stage": stage.stage, "description": stage.description, "timeout": stage.timeout}
+                for stage in self.stages
+            ]
         }
     
     @classmethod
@@ -121,12 +143,9 @@ class TaskContext:
             TaskContext object if successful, None if data is invalid
         """
         try:
+            # Positional arguments (stage, description, timeout) skip keyword matching per stage
             stages = [
-                Stage(
-                    stage=s["stage"],
-                    description=s["description"],
-                    timeout=s["timeout"]
-                )
+                Stage(s["stage"], s["description"], s["timeout"])
                 for s in data.get("stages", [])
             ]
             
@@ -150,6 +169,8 @@ class ClassificationResponse:
         status: Status code (NEXT, PREVIOUS, EXIT, HELP, CARE, HELLO, UNKNOWN, ERROR)
         message: Free text message providing context or explanation
     """
+    __slots__ = ("status", "message")
+    
     status: str
     message: str
     
@@ -160,9 +181,7 @@ class ClassificationResponse:
         Returns:
             True if response is valid, False otherwise
         """
-        valid_statuses = {"NEXT", "PREVIOUS", "EXIT", "HELP", "CARE", "HELLO", "UNKNOWN", "ERROR"}
-        
-        if not isinstance(self.status, str) or self.status not in valid_statuses:
+        if not isinstance(self.status, str) or self.status not in VALID_RESPONSE_STATUS_CODES:
             logger.warning(f"Invalid status code: {self.status}")
             return False
         
@@ -174,7 +193,7 @@ class ClassificationResponse:
     
     def to_dict(self) -> Dict[str, str]:
         """Convert response to dictionary."""
-        return asdict(self)
+        return {"status": self.status, "message": self.message}
     
     def to_json(self) -> str:
         """
@@ -183,6 +202,11 @@ class ClassificationResponse:
         Returns:
             JSON string representation of the response
         """
+        status, message = self.status, self.message
+        if type(status) is str and type(message) is str:
+            # Same text json.dumps produces for this fixed two-string shape,
+            # without building the intermediate dict or walking it generically
+            return f'{{"status": {encode_basestring_ascii(status)}, "message": {encode_basestring_ascii(message)}}}'
         return json.dumps(self.to_dict())
     
     @classmethod
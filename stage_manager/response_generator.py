@@ -6,10 +6,22 @@ import logging
 
 # Configure logger for this module
 logger = logging.getLogger(__name__)
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+
+# Default message for each status code
+_MESSAGES = {
+    "NEXT": "Moving forward to the next stage.",
+    "PREVIOUS": "Going back to the previous stage.",
+    "EXIT": "Exiting the task flow.",
+    "HELP": "Help is on the way. What do you need assistance with?",
+    "CARE": "I understand you need support.",
+    "HELLO": "Hello! How can I help you today?",
+    "UNKNOWN": "I'm not sure what you mean. Could you rephrase that?",
+    "ERROR": "An error occurred while processing your request."
+}
+_UNKNOWN_MESSAGE = _MESSAGES["UNKNOWN"]
+
+# Prebuilt response per status code; generate_response hands out copies
+_RESPONSES = {code: {"status": code, "message": message} for code, message in _MESSAGES.items()}
 
 
 class ResponseGenerator:
@@ -28,36 +40,35 @@ class ResponseGenerator:
             Dictionary with 'status' and 'message' keys
         """
         try:
-            messages = {
-                "NEXT": "Moving forward to the next stage.",
-                "PREVIOUS": "Going back to the previous stage.",
-                "EXIT": "Exiting the task flow.",
-                "HELP": "Help is on the way. What do you need assistance with?",
-                "CARE": "I understand you need support.",
-                "HELLO": "Hello! How can I help you today?",
-                "UNKNOWN": "I'm not sure what you mean. Could you rephrase that?",
-                "ERROR": "An error occurred while processing your request."
-            }
-            
             # Validate status code
             if not status_code or not isinstance(status_code, str):
                 logger.warning(f"Invalid status code: {status_code}, using UNKNOWN")
                 status_code = "UNKNOWN"
             
-            message = messages.get(status_code, messages["UNKNOWN"])
-            
             # Customize message based on context if provided
-            if context and isinstance(context, dict):
-                if status_code == "ERROR" and "error_message" in context:
-                    message = context["error_message"]
-                    logger.info(f"Generated ERROR response: {message}")
-            
-            response = {
-                "status": status_code,
-                "message": message
-            }
+            if (
+                context and isinstance(context, dict)
+                and status_code == "ERROR" and "error_message" in context
+            ):
+                message = context["error_message"]
+                logger.info(f"Generated ERROR response: {message}")
+                response = {
+                    "status": status_code,
+                    "message": message
+                }
+            else:
+                # Copying the prebuilt dict is cheaper than building one, and
+                # callers may still add keys to their copy
+                template = _RESPONSES.get(status_code)
+                if template is not None:
+                    response = template.copy()
+                else:
+                    response = {
+                        "status": status_code,
+                        "message": _UNKNOWN_MESSAGE
+                    }
             
-            logger.debug(f"Generated response for status {status_code}")
+            logger.debug("Generated response for status %s", status_code)
             return response
             
         except Exception as e:
@@ -1,22 +1,117 @@
 """Main StageManager agent implementation."""
 
+import json
 import logging
-from typing import Dict, Optional, Any
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Any, Tuple
 
 # No external agent library needed - using plain Python class
 
+from . import _json
 from .input_validator import InputValidator
 from .classification_engine import ClassificationEngine
+from .models import VALID_STATUS_CODES
 from .response_generator import ResponseGenerator
-from .llm_client import LLMClient
 
 
 # Configure logger for this module
 logger = logging.getLogger(__name__)
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+
+
+# "STATUS: message" format for Bedrock responses
+_STATUS_MESSAGE_PATTERN = re.compile(r'^([A-Z]+)\s*:\s*(.+)$', re.DOTALL)
+
+# Entries kept by classify_cached() unless the config sets "cache_size"
+_DEFAULT_CACHE_SIZE = 4096
+
+# Stateless helpers shared by every StageManager
+_INPUT_VALIDATOR = InputValidator()
+_RESPONSE_GENERATOR = ResponseGenerator()
+
+
+class BedrockLLMWrapper:
+    """Wrapper to make BedrockModel compatible with LLMClient interface."""
+    
+    def __init__(self, model):
+        # Imported here so pattern-only use never loads boto3
+        from .llm_client import DEFAULT_SYSTEM_PROMPT
+        
+        self.model = model
+        self.provider = "bedrock"
+        self.system_prompt = DEFAULT_SYSTEM_PROMPT
+    
+    def set_system_prompt(self, system_prompt: str):
+        """Set the fixed system prompt sent with every invocation."""
+        self.system_prompt = system_prompt
+    
+    def classify(self, prompt: str) -> Dict[str, str]:
+        """Call Bedrock model and parse response."""
+        try:
+            response_text = self.model.invoke(
+                prompt=prompt,
+                system_prompt=self.system_prompt
+            )
+            
+            # Parse response using same logic as LLMClient
+            return self._parse_response(response_text)
+            
+        except Exception as e:
+            logger.error(f"Bedrock model invocation failed: {e}")
+            return {"status": "UNKNOWN", "message": f"Bedrock error: {str(e)}"}
+    
+    def _parse_response(self, response: str) -> Dict[str, str]:
+        """Parse Bedrock response to extract status and message."""
+        if not response:
+            return {"status": "UNKNOWN", "message": "Empty response"}
+        
+        response = response.strip()
+        
+        # Try JSON format (only an object can carry a status)
+        if response.startswith("{"):
+            try:
+                data = _json.loads(response)
+                if isinstance(data, dict) and "status" in data:
+                    status = data["status"].upper()
+                    message = data.get("message", response)
+                    if status in VALID_STATUS_CODES:
+                        return {"status": status, "message": message}
+            except (json.JSONDecodeError, AttributeError):
+                # Invalid JSON or non-string status; try text parsing
+                pass
+        
+        # Try "STATUS: message" format
+        match = _STATUS_MESSAGE_PATTERN.match(response)
+        if match:
+            status = match.group(1).upper()
+            message = match.group(2).strip()
+            if status in VALID_STATUS_CODES:
+                return {"status": status, "message": message}
+        
+        # Try first word as status; only the first word is split off
+        parts = response.split(None, 1)
+        if parts:
+            first_word = parts[0].upper().rstrip(':,.')
+            if first_word in VALID_STATUS_CODES:
+                message = ' '.join(parts[1].split()) if len(parts) > 1 else response
+                return {"status": first_word, "message": message.strip()}
+        
+        return {"status": "UNKNOWN", "message": response}
+    
+    def classify_combined(self, prompt: str, expected_count: int) -> List[Dict[str, str]]:
+        """Call Bedrock model once for several inputs and parse the JSON array response."""
+        from .llm_client import LLMClient
+        
+        response_text = self.model.invoke(
+            prompt=prompt,
+            system_prompt=self.system_prompt
+        )
+        return LLMClient._parse_batch_response(response_text, expected_count)
+    
+    def is_available(self) -> bool:
+        """Check if Bedrock model is available."""
+        return True
 
 
 class StageManager:
@@ -43,7 +138,7 @@ class StageManager:
             logger.info("Initializing StageManager agent")
             
             self.config = config or {}
-            self.validator = InputValidator()
+            self.validator = _INPUT_VALIDATOR
             self.bedrock_model = bedrock_model
             
             # Initialize Bedrock client wrapper if BedrockModel is provided
@@ -57,8 +152,14 @@ class StageManager:
                 logger.info("No BedrockModel provided, using pattern-based classification")
             
             # Initialize classification engine with config and Bedrock client (Requirement 5.1)
-            self.engine = ClassificationEngine(config, llm_client)
-            self.response_generator = ResponseGenerator()
+            # The wrapper is created here for this engine alone, so it may set its system prompt
+            self.engine = ClassificationEngine(config, llm_client, owns_llm_client=llm_client is not None)
+            self.response_generator = _RESPONSE_GENERATOR
+            
+            # LRU of classify_cached() results keyed on (user_input, serialized task context)
+            self._cache_size = self._get_cache_size(self.config)
+            self._response_cache: "OrderedDict[Tuple[str, Optional[str]], Dict]" = OrderedDict()
+            self._response_cache_lock = threading.Lock()
             
             logger.info("StageManager agent initialized successfully")
             
@@ -66,6 +167,27 @@ class StageManager:
             logger.error(f"Critical error initializing StageManager: {e}", exc_info=True)
             raise
     
+    @staticmethod
+    def _get_cache_size(config: Any) -> int:
+        """
+        Read the classify_cached() size from the config.
+        
+        Args:
+            config: Configuration passed to the constructor
+            
+        Returns:
+            The configured size, or the default if missing or invalid
+        """
+        if not isinstance(config, dict):
+            logger.warning("Configuration is not a dictionary, using default cache size")
+            return _DEFAULT_CACHE_SIZE
+        
+        cache_size = config.get("cache_size", _DEFAULT_CACHE_SIZE)
+        if isinstance(cache_size, bool) or not isinstance(cache_size, int) or cache_size < 0:
+            logger.warning(f"cache_size must be a non-negative integer, got {cache_size!r}; using default")
+            return _DEFAULT_CACHE_SIZE
+        return cache_size
+    
     def _create_bedrock_llm_client(self, bedrock_model: Any):
         """
         Create an LLM client wrapper for BedrockModel.
@@ -76,72 +198,6 @@ class StageManager:
         Returns:
             LLM client wrapper
         """
-        class BedrockLLMWrapper:
-            """Wrapper to make BedrockModel compatible with LLMClient interface."""
-            
-            def __init__(self, model):
-                self.model = model
-                self.provider = "bedrock"
-            
-            def classify(self, prompt: str) -> Dict[str, str]:
-                """Call Bedrock model and parse response."""
-                try:
-                    response_text = self.model.invoke(
-                        prompt=prompt,
-                        system_prompt="You are a task navigation assistant."
-                    )
-                    
-                    # Parse response using same logic as LLMClient
-                    return self._parse_response(response_text)
-                    
-                except Exception as e:
-                    logger.error(f"Bedrock model invocation failed: {e}")
-                    return {"status": "UNKNOWN", "message": f"Bedrock error: {str(e)}"}
-            
-            def _parse_response(self, response: str) -> Dict[str, str]:
-                """Parse Bedrock response to extract status and message."""
-                import re
-                import json
-                
-                if not response:
-                    return {"status": "UNKNOWN", "message": "Empty response"}
-                
-                response = response.strip()
-                valid_statuses = {"NEXT", "PREVIOUS", "EXIT", "HELP", "CARE", "HELLO", "UNKNOWN"}
-                
-                # Try JSON format
-                try:
-                    data = json.loads(response)
-                    if isinstance(data, dict) and "status" in data:
-                        status = data["status"].upper()
-                        message = data.get("message", response)
-                        if status in valid_statuses:
-                            return {"status": status, "message": message}
-                except:
-                    pass
-                
-                # Try "STATUS: message" format
-                match = re.match(r'^([A-Z]+)\s*:\s*(.+)$', response, re.DOTALL)
-                if match:
-                    status = match.group(1).upper()
-                    message = match.group(2).strip()
-                    if status in valid_statuses:
-                        return {"status": status, "message": message}
-                
-                # Try first word as status
-                words = response.split()
-                if words:
-                    first_word = words[0].upper().rstrip(':,.')
-                    if first_word in valid_statuses:
-                        message = ' '.join(words[1:]) if len(words) > 1 else response
-                        return {"status": first_word, "message": message.strip()}
-                
-                return {"status": "UNKNOWN", "message": response}
-            
-            def is_available(self) -> bool:
-                """Check if Bedrock model is available."""
-                return True
-        
         return BedrockLLMWrapper(bedrock_model)
     
     def process_message(self, message: Any) -> Any:
@@ -161,7 +217,11 @@ class StageManager:
         elif isinstance(message, str):
             return self.classify(message)
         else:
-            return self.handle_error(ValueError(f"Invalid message type: {type(message)}"))
+            logger.warning(f"Invalid message type: {type(message)}")
+            return self.response_generator.generate_response(
+                "ERROR",
+                {"error_message": f"Invalid message type: {type(message).__name__}"}
+            )
     
     def classify(self, user_input: str, task_context: Optional[Dict] = None) -> Dict:
         """
@@ -177,8 +237,9 @@ class StageManager:
         Requirements: 1.2, 4.4, 7.2, 7.3, 8.3, 8.4
         """
         try:
-            logger.info("Processing classification request")
-            logger.debug(f"User input length: {len(user_input) if user_input else 0}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Processing classification request")
+                logger.debug("User input length: %d", len(user_input) if user_input else 0)
             
             # Validate user input (Requirement 1.2)
             if not self.validator.validate_user_input(user_input):
@@ -200,7 +261,7 @@ class StageManager:
             # Classify the intent
             try:
                 status_code = self.engine.classify_intent(user_input, task_context)
-                logger.info(f"Classification result: {status_code}")
+                logger.debug("Classification result: %s", status_code)
                 
                 # Generate response for the classified status code
                 return self.response_generator.generate_response(status_code)
@@ -219,3 +280,139 @@ class StageManager:
                 "ERROR",
                 {"error_message": f"An unexpected error occurred: {str(e)}"}
             )
+    
+    def classify_many(self, inputs: List[str], context: Optional[Dict] = None) -> List[Dict]:
+        """
+        Classify several user inputs that share the same task context.
+        
+        The context is validated once, and with an LLM backend all valid
+        inputs are classified in a single request instead of one per input.
+        
+        Args:
+            inputs: List of user text inputs
+            context: Optional JSON task context with stages
+            
+        Returns:
+            List of dictionaries with 'status' and 'message' keys, in input order
+        """
+        try:
+            logger.info(f"Processing batch classification request for {len(inputs)} inputs")
+            
+            if context is not None and not self.validator.validate_task_context(context):
+                logger.warning("Task context validation failed")
+                return [
+                    self.response_generator.generate_response(
+                        "ERROR",
+                        {"error_message": "Invalid task context structure"}
+                    )
+                    for _ in inputs
+                ]
+            
+            valid = [self.validator.validate_user_input(user_input) for user_input in inputs]
+            status_codes = iter(self.engine.classify_intents(
+                [user_input for user_input, ok in zip(inputs, valid) if ok], context
+            ))
+            
+            results = []
+            for ok in valid:
+                if ok:
+                    results.append(self.response_generator.generate_response(next(status_codes)))
+                else:
+                    results.append(self.response_generator.generate_response(
+                        "ERROR",
+                        {"error_message": "Input cannot be empty or whitespace-only"}
+                    ))
+            return results
+            
+        except Exception as e:
+            logger.error(f"Unexpected error in classify_many method: {e}", exc_info=True)
+            return [
+                self.response_generator.generate_response(
+                    "ERROR",
+                    {"error_message": f"An unexpected error occurred: {str(e)}"}
+                )
+                for _ in inputs
+            ]
+    
+    def classify_batch(self, pairs: List[Tuple[str, Optional[Dict]]]) -> List[Dict]:
+        """
+        Classify (user_input, task_context) pairs that may use different contexts.
+        
+        Pairs with equal contexts are classified together with classify_many(),
+        so each distinct context is validated once and, with an LLM backend,
+        costs one request.
+        
+        Args:
+            pairs: List of (user input, optional task context) tuples
+            
+        Returns:
+            List of dictionaries with 'status' and 'message' keys, in pair order
+        """
+        # Group input positions by serialized context, as classify_cached()
+        # keys its entries; contexts that can't be serialized group by object
+        groups: Dict[Any, Tuple[Optional[Dict], List[int]]] = {}
+        for index, (_, task_context) in enumerate(pairs):
+            try:
+                key = json.dumps(task_context, sort_keys=True)
+            except (TypeError, ValueError):
+                key = id(task_context)
+            groups.setdefault(key, (task_context, []))[1].append(index)
+        
+        results: List[Optional[Dict]] = [None] * len(pairs)
+        for task_context, indices in groups.values():
+            responses = self.classify_many([pairs[i][0] for i in indices], task_context)
+            for index, response in zip(indices, responses):
+                results[index] = response
+        return results
+    
+    def classify_cached(self, user_input: str, task_context: Optional[Dict] = None) -> Dict:
+        """
+        Classify user input, reusing results for repeated (input, context) pairs.
+        
+        Intended for loops that feed the same utterances many times; with an
+        LLM backend every cache hit saves a network round-trip. Without one,
+        inputs differing only in case or surrounding whitespace share an entry.
+        
+        Args:
+            user_input: User's text input
+            task_context: Optional JSON task context with stages
+            
+        Returns:
+            Dictionary with 'status' and 'message' keys
+        """
+        # Pattern rules only see the normalized input, so without an LLM
+        # "Next", " next " and "next" can share one cache entry
+        if self.engine.llm_client is None and isinstance(user_input, str):
+            user_input = self.validator.normalize_input(user_input)
+        
+        try:
+            context_key = json.dumps(task_context, sort_keys=True) if task_context is not None else None
+            key = (user_input, context_key)
+            with self._response_cache_lock:
+                cached = self._response_cache.get(key)
+                if cached is not None:
+                    self._response_cache.move_to_end(key)
+        except (TypeError, ValueError):
+            # Unhashable input or non-serializable context; classify without caching
+            logger.debug("Input not cacheable, classifying directly")
+            return self.classify(user_input, task_context)
+        
+        # Hand out copies so callers can't mutate the cached response
+        if cached is not None:
+            return dict(cached)
+        
+        result = self.classify(user_input, task_context)
+        # ERROR responses may be transient, so only keep real classifications
+        if result["status"] != "ERROR":
+            self._store_cached_response(key, result)
+        return result
+    
+    def _store_cached_response(self, key: Tuple[str, Optional[str]], result: Dict):
+        """Cache a classify_cached() result, evicting the least recently used entries."""
+        # A cache_size of 0 disables caching
+        if self._cache_size == 0:
+            return
+        with self._response_cache_lock:
+            self._response_cache[key] = dict(result)
+            while len(self._response_cache) > self._cache_size:
+                self._response_cache.popitem(last=False)
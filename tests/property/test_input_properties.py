@@ -1,7 +1,6 @@
 """Property-based tests for input validation."""
 
-import pytest
-from hypothesis import given, strategies as st, assume
+from hypothesis import given, settings, strategies as st, assume
 from stage_manager.input_validator import InputValidator
 
 
@@ -29,6 +28,11 @@ from stage_manager.input_validator import InputValidator
 # **Validates: Requirements 1.4**
 
 
+# The immutability and unicode properties only re-check that the validator
+# reads its input without failing, so they run a smaller example budget;
+# the acceptance and rejection properties keep hypothesis' default of 100
+fast_settings = settings(max_examples=25, deadline=None)
+
 # Strategy for generating non-empty, non-whitespace strings
 valid_input_strategy = st.text(min_size=1, max_size=1000).filter(lambda x: x.strip())
 
@@ -142,12 +146,8 @@ class TestWhitespaceRejection:
         For any combination of whitespace characters, the InputValidator
         should reject the input.
         """
-        # Generate various whitespace combinations
-        whitespace_chars = [' ', '\t', '\n', '\r']
-        whitespace_input = ''.join(
-            whitespace_chars[i % len(whitespace_chars)] 
-            for i in range(whitespace_count)
-        )
+        # Generate various whitespace combinations by cycling ' \t\n\r'
+        whitespace_input = (' \t\n\r' * (whitespace_count // 4 + 1))[:whitespace_count]
         
         result = InputValidator.validate_user_input(whitespace_input)
         
@@ -158,6 +158,7 @@ class TestWhitespaceRejection:
 class TestInputImmutability:
     """Property-based tests for input immutability."""
     
+    @fast_settings
     @given(user_input=valid_input_strategy)
     def test_input_remains_unchanged_after_validation(self, user_input):
         """
@@ -168,7 +169,6 @@ class TestInputImmutability:
         """
         # Store original input
         original_input = user_input
-        original_id = id(user_input)
         
         # Validate the input
         InputValidator.validate_user_input(user_input)
@@ -176,11 +176,8 @@ class TestInputImmutability:
         # Verify input hasn't changed
         assert user_input == original_input, \
             "Input string should remain unchanged after validation"
-        
-        # Verify it's the same object (strings are immutable in Python)
-        assert id(user_input) == original_id, \
-            "Input string object should remain the same"
     
+    @fast_settings
     @given(user_input=valid_input_strategy)
     def test_input_immutability_with_multiple_validations(self, user_input):
         """
@@ -203,6 +200,7 @@ class TestInputImmutability:
 class TestUnicodeHandling:
     """Property-based tests for unicode handling."""
     
+    @fast_settings
     @given(unicode_input=unicode_strategy)
     def test_handles_unicode_characters_without_errors(self, unicode_input):
         """
@@ -212,17 +210,13 @@ class TestUnicodeHandling:
         should process it without raising encoding errors or exceptions.
         """
         # Should not raise an exception
-        try:
-            result = InputValidator.validate_user_input(unicode_input)
-            
-            # Should return True for valid unicode input
-            assert result is True, \
-                f"Should accept unicode input: '{unicode_input[:50]}...'"
-        except UnicodeError as e:
-            pytest.fail(f"Should not raise UnicodeError for unicode input: {e}")
-        except Exception as e:
-            pytest.fail(f"Should not raise exception for unicode input: {e}")
+        result = InputValidator.validate_user_input(unicode_input)
+        
+        # Should return True for valid unicode input
+        assert result is True, \
+            f"Should accept unicode input: '{unicode_input[:50]}...'"
     
+    @fast_settings
     @given(special_chars=special_char_strategy)
     def test_handles_special_characters_without_errors(self, special_chars):
         """
@@ -232,15 +226,13 @@ class TestUnicodeHandling:
         should process it without raising exceptions.
         """
         # Should not raise an exception
-        try:
-            result = InputValidator.validate_user_input(special_chars)
-            
-            # Should return True for valid special character input
-            assert result is True, \
-                f"Should accept special character input: '{special_chars[:50]}...'"
-        except Exception as e:
-            pytest.fail(f"Should not raise exception for special characters: {e}")
+        result = InputValidator.validate_user_input(special_chars)
+        
+        # Should return True for valid special character input
+        assert result is True, \
+            f"Should accept special character input: '{special_chars[:50]}...'"
     
+    @fast_settings
     @given(
         text=st.text(min_size=1, max_size=100).filter(lambda x: x.strip()),
         emoji=st.sampled_from(['😀', '🎉', '❤️', '🚀', '✨', '🔥', '💯', '🌟'])
@@ -254,15 +246,13 @@ class TestUnicodeHandling:
         """
         emoji_input = f"{text} {emoji}"
         
-        try:
-            result = InputValidator.validate_user_input(emoji_input)
-            
-            # Should return True for valid emoji input
-            assert result is True, \
-                f"Should accept emoji input: '{emoji_input}'"
-        except Exception as e:
-            pytest.fail(f"Should not raise exception for emoji: {e}")
+        result = InputValidator.validate_user_input(emoji_input)
+        
+        # Should return True for valid emoji input
+        assert result is True, \
+            f"Should accept emoji input: '{emoji_input}'"
     
+    @fast_settings
     @given(
         text=st.text(
             alphabet=st.characters(
@@ -281,15 +271,13 @@ class TestUnicodeHandling:
         For any string containing CJK (Chinese, Japanese, Korean) characters,
         the InputValidator should process it without raising exceptions.
         """
-        try:
-            result = InputValidator.validate_user_input(text)
-            
-            # Should return True for valid CJK input
-            assert result is True, \
-                f"Should accept CJK input: '{text[:20]}...'"
-        except Exception as e:
-            pytest.fail(f"Should not raise exception for CJK characters: {e}")
+        result = InputValidator.validate_user_input(text)
+        
+        # Should return True for valid CJK input
+        assert result is True, \
+            f"Should accept CJK input: '{text[:20]}...'"
     
+    @fast_settings
     @given(
         base_text=st.text(min_size=1, max_size=50).filter(lambda x: x.strip()),
         combining_chars=st.text(
@@ -311,14 +299,11 @@ class TestUnicodeHandling:
         """
         combined_input = base_text + combining_chars
         
-        try:
-            result = InputValidator.validate_user_input(combined_input)
-            
-            # Should return True for valid combined character input
-            assert result is True, \
-                f"Should accept combined character input: '{combined_input[:50]}...'"
-        except Exception as e:
-            pytest.fail(f"Should not raise exception for combining characters: {e}")
+        result = InputValidator.validate_user_input(combined_input)
+        
+        # Should return True for valid combined character input
+        assert result is True, \
+            f"Should accept combined character input: '{combined_input[:50]}...'"
 
 
 class TestInputValidationEdgeCases:
@@ -360,10 +345,7 @@ class TestInputValidationEdgeCases:
         """
         long_input = 'a' * length
         
-        try:
-            result = InputValidator.validate_user_input(long_input)
-            
-            assert result is True, \
-                f"Should accept very long input of length {length}"
-        except Exception as e:
-            pytest.fail(f"Should not raise exception for long input: {e}")
+        result = InputValidator.validate_user_input(long_input)
+        
+        assert result is True, \
+            f"Should accept very long input of length {length}"
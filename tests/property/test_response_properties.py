@@ -17,7 +17,7 @@ VALID_STATUS_CODES = {"NEXT", "PREVIOUS", "EXIT", "HELP", "CARE", "HELLO", "UNKN
 
 
 # Strategy for generating valid status codes
-status_code_strategy = st.sampled_from(list(VALID_STATUS_CODES))
+status_code_strategy = st.sampled_from(sorted(VALID_STATUS_CODES))
 
 
 # Strategy for generating optional context dictionaries
@@ -4,6 +4,43 @@ import pytest
 from stage_manager.classification_engine import ClassificationEngine
 
 
+# Stage lists shared by the context tests; the engine only reads them
+_TWO_STAGES = [
+    {"stage": "Stage 1", "description": "First", "timeout": 300},
+    {"stage": "Stage 2", "description": "Second", "timeout": 300}
+]
+_THREE_STAGES = _TWO_STAGES + [
+    {"stage": "Stage 3", "description": "Third", "timeout": 300}
+]
+
+# Custom rules shared by the configuration tests; the engine only reads them
+_CUSTOM_CONFIG = {
+    "classification_rules": {
+        "NEXT": ["forward", "onward"],
+        "EXIT": ["bye", "goodbye"]
+    }
+}
+
+# (user_input, expected status) pairs for the single-input classification tests
+CLASSIFICATION_CASES = [
+    ("next", "NEXT"),
+    ("continue", "NEXT"),
+    ("proceed", "NEXT"),
+    ("back", "PREVIOUS"),
+    ("previous", "PREVIOUS"),
+    ("quit", "EXIT"),
+    ("exit", "EXIT"),
+    ("help", "HELP"),
+    ("call my mom", "HELP"),
+    ("worried", "CARE"),
+    ("anxious", "CARE"),
+    ("hello", "HELLO"),
+    ("hi", "HELLO"),
+    ("banana", "UNKNOWN"),
+    ("maybe I'll eat", "UNKNOWN"),
+]
+
+
 class TestClassificationEngineBasic:
     """Unit tests for basic classification functionality."""
     
@@ -11,80 +48,15 @@ class TestClassificationEngineBasic:
         """Set up test fixtures."""
         self.engine = ClassificationEngine()
     
-    def test_next_classification_next(self):
-        """Test NEXT classification with 'next'."""
-        result = self.engine.classify_intent("next")
-        assert result == "NEXT"
-    
-    def test_next_classification_continue(self):
-        """Test NEXT classification with 'continue'."""
-        result = self.engine.classify_intent("continue")
-        assert result == "NEXT"
-    
-    def test_next_classification_proceed(self):
-        """Test NEXT classification with 'proceed'."""
-        result = self.engine.classify_intent("proceed")
-        assert result == "NEXT"
-    
-    def test_previous_classification_back(self):
-        """Test PREVIOUS classification with 'back'."""
-        result = self.engine.classify_intent("back")
-        assert result == "PREVIOUS"
-    
-    def test_previous_classification_previous(self):
-        """Test PREVIOUS classification with 'previous'."""
-        result = self.engine.classify_intent("previous")
-        assert result == "PREVIOUS"
-    
-    def test_exit_classification_quit(self):
-        """Test EXIT classification with 'quit'."""
-        result = self.engine.classify_intent("quit")
-        assert result == "EXIT"
-    
-    def test_exit_classification_exit(self):
-        """Test EXIT classification with 'exit'."""
-        result = self.engine.classify_intent("exit")
-        assert result == "EXIT"
-    
-    def test_help_classification_help(self):
-        """Test HELP classification with 'help'."""
-        result = self.engine.classify_intent("help")
-        assert result == "HELP"
-    
-    def test_help_classification_call_my_mom(self):
-        """Test HELP classification with 'call my mom'."""
-        result = self.engine.classify_intent("call my mom")
-        assert result == "HELP"
-    
-    def test_care_classification_worried(self):
-        """Test CARE classification with 'worried'."""
-        result = self.engine.classify_intent("worried")
-        assert result == "CARE"
-    
-    def test_care_classification_anxious(self):
-        """Test CARE classification with 'anxious'."""
-        result = self.engine.classify_intent("anxious")
-        assert result == "CARE"
-    
-    def test_hello_classification_hello(self):
-        """Test HELLO classification with 'hello'."""
-        result = self.engine.classify_intent("hello")
-        assert result == "HELLO"
-    
-    def test_hello_classification_hi(self):
-        """Test HELLO classification with 'hi'."""
-        result = self.engine.classify_intent("hi")
-        assert result == "HELLO"
-    
-    def test_unknown_classification_banana(self):
-        """Test UNKNOWN classification with 'banana'."""
-        result = self.engine.classify_intent("banana")
-        assert result == "UNKNOWN"
-    
-    def test_unknown_classification_maybe_ill_eat(self):
-        """Test UNKNOWN classification with 'maybe I'll eat'."""
-        result = self.engine.classify_intent("maybe I'll eat")
-        assert result == "UNKNOWN"
+    @pytest.mark.parametrize(
+        "user_input,expected",
+        CLASSIFICATION_CASES,
+        ids=[case[0] for case in CLASSIFICATION_CASES]
+    )
+    def test_classification(self, user_input, expected):
+        """Test each keyword input classifies to its status code."""
+        result = self.engine.classify_intent(user_input)
+        assert result == expected
 
 
 class TestClassificationEngineConfiguration:
@@ -105,34 +77,52 @@ class TestClassificationEngineConfiguration:
     
     def test_initialization_with_custom_config(self):
         """Test initialization with custom configuration."""
-        custom_config = {
-            "classification_rules": {
-                "NEXT": ["forward", "onward"],
-                "EXIT": ["bye", "goodbye"]
-            }
-        }
+        engine = ClassificationEngine(config=_CUSTOM_CONFIG)
         
-        engine = ClassificationEngine(config=custom_config)
-        
-        assert engine.config == custom_config
+        assert engine.config == _CUSTOM_CONFIG
         assert engine.classification_rules["NEXT"] == ["forward", "onward"]
         assert engine.classification_rules["EXIT"] == ["bye", "goodbye"]
     
     def test_custom_patterns_classification(self):
         """Test classification with custom patterns."""
+        engine = ClassificationEngine(config=_CUSTOM_CONFIG)
+        
+        assert engine.classify_intent("forward") == "NEXT"
+        assert engine.classify_intent("onward") == "NEXT"
+        assert engine.classify_intent("bye") == "EXIT"
+        assert engine.classify_intent("next") == "UNKNOWN"  # Default pattern not in custom config
+    
+    def test_rule_order_decides_between_matching_patterns(self):
+        """Test the first status code in rule order wins, wherever its pattern occurs."""
         custom_config = {
             "classification_rules": {
-                "NEXT": ["forward", "onward"],
-                "EXIT": ["bye"]
+                "EXIT": ["stop"],
+                "NEXT": ["go", "stop"]
             }
         }
         
         engine = ClassificationEngine(config=custom_config)
         
-        assert engine.classify_intent("forward") == "NEXT"
-        assert engine.classify_intent("onward") == "NEXT"
+        # "go" appears first in the input, but EXIT comes first in the rules
+        assert engine.classify_intent("go now, then stop") == "EXIT"
+        assert engine.classify_intent("go now") == "NEXT"
+    
+    def test_assigning_rules_recompiles(self):
+        """Test assigning new rules takes effect after earlier classifications."""
+        engine = ClassificationEngine()
+        assert engine.classify_intent("bye") == "UNKNOWN"
+        
+        engine.classification_rules = _CUSTOM_CONFIG["classification_rules"]
         assert engine.classify_intent("bye") == "EXIT"
-        assert engine.classify_intent("next") == "UNKNOWN"  # Default pattern not in custom config
+        assert engine.classify_intent("next") == "UNKNOWN"
+    
+    def test_assigning_invalid_rules_uses_defaults(self):
+        """Test assigning rules that aren't a dict falls back to the defaults."""
+        engine = ClassificationEngine(config=_CUSTOM_CONFIG)
+        engine.classification_rules = ["not", "a", "dict"]
+        
+        assert engine.classification_rules == engine._get_default_config()["classification_rules"]
+        assert engine.classify_intent("next") == "NEXT"
 
 
 class TestClassificationEngineStageExtraction:
@@ -186,10 +176,7 @@ class TestClassificationEngineStageBoundaries:
     def test_is_at_first_stage_true(self):
         """Test is_at_first_stage returns True for first stage."""
         task_context = {
-            "stages": [
-                {"stage": "Stage 1", "description": "First", "timeout": 300},
-                {"stage": "Stage 2", "description": "Second", "timeout": 300}
-            ]
+            "stages": _TWO_STAGES
         }
         
         result = self.engine.is_at_first_stage(task_context, "Stage 1")
@@ -198,10 +185,7 @@ class TestClassificationEngineStageBoundaries:
     def test_is_at_first_stage_false(self):
         """Test is_at_first_stage returns False for non-first stage."""
         task_context = {
-            "stages": [
-                {"stage": "Stage 1", "description": "First", "timeout": 300},
-                {"stage": "Stage 2", "description": "Second", "timeout": 300}
-            ]
+            "stages": _TWO_STAGES
         }
         
         result = self.engine.is_at_first_stage(task_context, "Stage 2")
@@ -224,10 +208,7 @@ class TestClassificationEngineStageBoundaries:
     def test_is_at_last_stage_true(self):
         """Test is_at_last_stage returns True for last stage."""
         task_context = {
-            "stages": [
-                {"stage": "Stage 1", "description": "First", "timeout": 300},
-                {"stage": "Stage 2", "description": "Second", "timeout": 300}
-            ]
+            "stages": _TWO_STAGES
         }
         
         result = self.engine.is_at_last_stage(task_context, "Stage 2")
@@ -236,10 +217,7 @@ class TestClassificationEngineStageBoundaries:
     def test_is_at_last_stage_false(self):
         """Test is_at_last_stage returns False for non-last stage."""
         task_context = {
-            "stages": [
-                {"stage": "Stage 1", "description": "First", "timeout": 300},
-                {"stage": "Stage 2", "description": "Second", "timeout": 300}
-            ]
+            "stages": _TWO_STAGES
         }
         
         result = self.engine.is_at_last_stage(task_context, "Stage 1")
@@ -271,11 +249,7 @@ class TestClassificationEngineContextAware:
         """Test PREVIOUS at first stage returns UNKNOWN."""
         task_context = {
             "current_stage": "Stage 1",
-            "stages": [
-                {"stage": "Stage 1", "description": "First", "timeout": 300},
-                {"stage": "Stage 2", "description": "Second", "timeout": 300},
-                {"stage": "Stage 3", "description": "Third", "timeout": 300}
-            ]
+            "stages": _THREE_STAGES
         }
         
         result = self.engine.classify_intent("go back", task_context)
@@ -285,11 +259,7 @@ class TestClassificationEngineContextAware:
         """Test NEXT at last stage returns UNKNOWN."""
         task_context = {
             "current_stage": "Stage 3",
-            "stages": [
-                {"stage": "Stage 1", "description": "First", "timeout": 300},
-                {"stage": "Stage 2", "description": "Second", "timeout": 300},
-                {"stage": "Stage 3", "description": "Third", "timeout": 300}
-            ]
+            "stages": _THREE_STAGES
         }
         
         result = self.engine.classify_intent("next", task_context)
@@ -299,11 +269,7 @@ class TestClassificationEngineContextAware:
         """Test PREVIOUS at middle stage is allowed."""
         task_context = {
             "current_stage": "Stage 2",
-            "stages": [
-                {"stage": "Stage 1", "description": "First", "timeout": 300},
-                {"stage": "Stage 2", "description": "Second", "timeout": 300},
-                {"stage": "Stage 3", "description": "Third", "timeout": 300}
-            ]
+            "stages": _THREE_STAGES
         }
         
         result = self.engine.classify_intent("go back", task_context)
@@ -313,11 +279,7 @@ class TestClassificationEngineContextAware:
         """Test NEXT at middle stage is allowed."""
         task_context = {
             "current_stage": "Stage 2",
-            "stages": [
-                {"stage": "Stage 1", "description": "First", "timeout": 300},
-                {"stage": "Stage 2", "description": "Second", "timeout": 300},
-                {"stage": "Stage 3", "description": "Third", "timeout": 300}
-            ]
+            "stages": _THREE_STAGES
         }
         
         result = self.engine.classify_intent("next", task_context)
@@ -327,11 +289,7 @@ class TestClassificationEngineContextAware:
         """Test that stage from input takes priority over context."""
         task_context = {
             "current_stage": "Stage 1",
-            "stages": [
-                {"stage": "Stage 1", "description": "First", "timeout": 300},
-                {"stage": "Stage 2", "description": "Second", "timeout": 300},
-                {"stage": "Stage 3", "description": "Third", "timeout": 300}
-            ]
+            "stages": _THREE_STAGES
         }
         
         # User says they're at stage 2, even though context says stage 1
@@ -342,10 +300,7 @@ class TestClassificationEngineContextAware:
         """Test fallback to context stage when input has no stage."""
         task_context = {
             "current_stage": "Stage 1",
-            "stages": [
-                {"stage": "Stage 1", "description": "First", "timeout": 300},
-                {"stage": "Stage 2", "description": "Second", "timeout": 300}
-            ]
+            "stages": _TWO_STAGES
         }
         
         result = self.engine.classify_intent("previous", task_context)
@@ -358,3 +313,162 @@ class TestClassificationEngineContextAware:
         
         result = self.engine.classify_intent("previous")
         assert result == "PREVIOUS"
+
+
+class TestClassificationEngineBatch:
+    """Unit tests for batch classification."""
+    
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.engine = ClassificationEngine()
+    
+    def test_classify_intents_preserves_order(self):
+        """Test batch classification returns one status per input in order."""
+        result = self.engine.classify_intents(["next", "go back", "banana", "hi"])
+        assert result == ["NEXT", "PREVIOUS", "UNKNOWN", "HELLO"]
+    
+    def test_classify_intents_matches_single_classification(self):
+        """Test batch results agree with classify_intent under a task context."""
+        task_context = {
+            "current_stage": "Stage 1",
+            "stages": _TWO_STAGES
+        }
+        inputs = ["go back", "next", "I'm at stage 2, go back", "help"]
+        
+        expected = [self.engine.classify_intent(text, task_context) for text in inputs]
+        assert self.engine.classify_intents(inputs, task_context) == expected
+    
+    def test_classify_intents_empty_input(self):
+        """Test empty inputs in a batch classify as UNKNOWN."""
+        assert self.engine.classify_intents(["", "next"]) == ["UNKNOWN", "NEXT"]
+    
+    def test_classify_intents_uses_single_llm_request(self):
+        """Test an LLM client with classify_combined is called once per batch."""
+        class BatchClient:
+            def __init__(self):
+                self.prompts = []
+            
+            def classify_combined(self, prompt, expected_count):
+                self.prompts.append(prompt)
+                return [{"status": "HELP", "message": "m"}] * expected_count
+        
+        client = BatchClient()
+        engine = ClassificationEngine(llm_client=client)
+        
+        assert engine.classify_intents(["a", "", "b"]) == ["HELP", "UNKNOWN", "HELP"]
+        assert len(client.prompts) == 1
+    
+    def test_classify_intents_falls_back_when_batch_fails(self):
+        """Test a failed batch request falls back to per-input classification."""
+        class FailingClient:
+            def classify_combined(self, prompt, expected_count):
+                raise RuntimeError("boom")
+            
+            def classify(self, prompt):
+                raise RuntimeError("boom")
+        
+        engine = ClassificationEngine(llm_client=FailingClient())
+        assert engine.classify_intents(["next", "quit"]) == ["NEXT", "EXIT"]
+    
+    def test_classify_intents_falls_back_on_malformed_batch(self):
+        """Test a batch response that isn't a list of dicts falls back to patterns."""
+        from unittest.mock import Mock
+        
+        client = Mock()
+        client.classify.side_effect = RuntimeError("boom")
+        
+        engine = ClassificationEngine(llm_client=client)
+        assert engine.classify_intents(["next", "quit"]) == ["NEXT", "EXIT"]
+    
+    def test_classify_intents_invalid_batch_status_is_unknown(self):
+        """Test batched statuses outside the valid codes come back as UNKNOWN."""
+        class BatchClient:
+            def classify_combined(self, prompt, expected_count):
+                return [{"status": "MAYBE", "message": "m"}, {"status": "EXIT", "message": "m"}]
+        
+        engine = ClassificationEngine(llm_client=BatchClient())
+        assert engine.classify_intents(["a", "b"]) == ["UNKNOWN", "EXIT"]
+
+
+class TestClassificationEngineLLM:
+    """Unit tests for single-input classification through an LLM client."""
+    
+    def test_classify_intent_uses_classify_on_duck_typed_client(self):
+        """Test a client exposing only classify() has its status returned."""
+        class StubClient:
+            def __init__(self):
+                self.prompts = []
+            
+            def classify(self, prompt):
+                self.prompts.append(prompt)
+                return {"status": "HELP", "message": "m"}
+        
+        client = StubClient()
+        engine = ClassificationEngine(llm_client=client)
+        
+        assert engine.classify_intent("banana") == "HELP"
+        assert len(client.prompts) == 1
+    
+    def test_classify_intent_invalid_llm_status_is_unknown(self):
+        """Test a status outside the valid codes comes back as UNKNOWN."""
+        class StubClient:
+            def classify(self, prompt):
+                return {"status": "MAYBE", "message": "m"}
+        
+        engine = ClassificationEngine(llm_client=StubClient())
+        assert engine.classify_intent("next") == "UNKNOWN"
+    
+    def test_shared_client_system_prompt_is_left_alone(self):
+        """Test a client the engine doesn't own keeps its system prompt."""
+        class StubClient:
+            def __init__(self):
+                self.system_prompts = []
+                self.prompts = []
+            
+            def set_system_prompt(self, system_prompt):
+                self.system_prompts.append(system_prompt)
+            
+            def classify(self, prompt):
+                self.prompts.append(prompt)
+                return {"status": "HELP", "message": "m"}
+        
+        client = StubClient()
+        engine = ClassificationEngine(llm_client=client)
+        engine.classify_intent("banana")
+        
+        assert client.system_prompts == []
+        assert "Classify the user's intent" in client.prompts[0]
+    
+    def test_owned_client_gets_system_prompt(self):
+        """Test an owned client receives the instructions once as its system prompt."""
+        class StubClient:
+            def __init__(self):
+                self.system_prompts = []
+                self.prompts = []
+            
+            def set_system_prompt(self, system_prompt):
+                self.system_prompts.append(system_prompt)
+            
+            def classify(self, prompt):
+                self.prompts.append(prompt)
+                return {"status": "HELP", "message": "m"}
+        
+        client = StubClient()
+        engine = ClassificationEngine(llm_client=client, owns_llm_client=True)
+        engine.classify_intent("banana")
+        
+        assert len(client.system_prompts) == 1
+        assert "Classify the user's intent" in client.system_prompts[0]
+        assert "Classify the user's intent" not in client.prompts[0]
+    
+    def test_engine_accepts_extra_attributes(self):
+        """Test callers can still set and patch attributes of their own."""
+        from unittest.mock import patch
+        
+        engine = ClassificationEngine()
+        engine.label = "primary"
+        with patch.object(engine, "classify_intent", return_value="HELP"):
+            assert engine.classify_intent("next") == "HELP"
+        
+        assert engine.label == "primary"
+        assert engine.classify_intent("next") == "NEXT"
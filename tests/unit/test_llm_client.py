@@ -0,0 +1,238 @@
+"""Unit tests for LLMClient."""
+
+import json
+import threading
+import time
+
+import pytest
+from stage_manager.classification_engine import ClassificationEngine
+from stage_manager.llm_client import LLMClient, LLMConnectionError, LLMResponseError
+
+
+def make_client(api_call):
+    """Build an OpenAI-style client whose provider call is replaced by api_call."""
+    client = LLMClient(api_key="test-key", model="gpt-4", max_retries=1, retry_delay=0)
+    client._api_call = api_call
+    return client
+
+
+class TestLLMClientProviderDetection:
+    """Unit tests for choosing the provider from a custom endpoint."""
+    
+    @pytest.mark.parametrize("endpoint,expected", [
+        ("https://api.openai.com/v1/chat/completions", "openai"),
+        ("https://my-resource.openai.azure.com/openai/deployments/x", "openai"),
+        ("https://api.anthropic.com/v1/messages", "anthropic"),
+        ("https://bedrock-runtime.us-east-1.amazonaws.com", "bedrock"),
+        ("http://localhost:8000/openai/v1", "custom"),
+        ("http://proxy.internal/anthropic/v1/messages", "custom"),
+        ("http://localhost:8000/v1/completions", "custom"),
+        ("api.openai.com", "openai"),
+    ], ids=["openai_host", "azure_host", "anthropic_host", "bedrock_host",
+            "openai_path", "anthropic_path", "unknown", "no_scheme"])
+    def test_detect_provider_from_endpoint(self, endpoint, expected):
+        """Test only the endpoint host decides the provider."""
+        client = LLMClient(api_key="test-key", model="local-model", endpoint=endpoint)
+        assert client.provider == expected
+
+
+class FakeResponse:
+    """Minimal requests.Response stand-in for a successful OpenAI reply."""
+    
+    status_code = 200
+    text = ""
+    
+    def json(self):
+        return {"choices": [{"message": {"content": "HELP: ok"}}]}
+
+
+class FakeSession:
+    """Session stub recording the request bodies it is asked to post."""
+    
+    def __init__(self):
+        self.bodies = []
+    
+    def post(self, endpoint, headers, data, timeout):
+        self.bodies.append(data)
+        return FakeResponse()
+
+
+class TestLLMClientRequestBody:
+    """Unit tests for serializing prompts into request bodies."""
+    
+    def test_lone_surrogate_in_prompt_is_escaped(self):
+        """Test a prompt with a lone surrogate is sent instead of failing as a connection error."""
+        client = LLMClient(api_key="test-key", model="gpt-4", max_retries=1, retry_delay=0)
+        session = FakeSession()
+        client._session = session
+        prompt = "hi \ud800 there"
+        
+        assert client.classify(prompt)["status"] == "HELP"
+        assert json.loads(session.bodies[0])["messages"][1]["content"] == prompt
+
+
+class TestLLMClientBatchParsing:
+    """Unit tests for parsing batched LLM responses."""
+    
+    def test_parse_batch_response(self):
+        """Test a JSON array in surrounding text parses in order."""
+        response = 'Here you go:\n[{"status": "next", "message": "a"}, {"status": "EXIT", "message": "b"}]'
+        
+        assert LLMClient._parse_batch_response(response, 2) == [
+            {"status": "NEXT", "message": "a"},
+            {"status": "EXIT", "message": "b"}
+        ]
+    
+    def test_parse_batch_response_wrong_length(self):
+        """Test an array with the wrong number of results is rejected."""
+        response = '[{"status": "NEXT", "message": "a"}]'
+        
+        with pytest.raises(LLMResponseError):
+            LLMClient._parse_batch_response(response, 2)
+    
+    def test_parse_batch_response_invalid_status(self):
+        """Test statuses outside the valid codes are mapped to UNKNOWN."""
+        response = '[{"status": "MAYBE", "message": "a"}, {"status": "HELP", "message": "b"}]'
+        
+        results = LLMClient._parse_batch_response(response, 2)
+        assert [r["status"] for r in results] == ["UNKNOWN", "HELP"]
+
+
+class TestLLMClientConcurrent:
+    """Unit tests for classifying independent prompts concurrently."""
+    
+    def test_classify_concurrently_keeps_prompt_order(self):
+        """Test results come back in prompt order."""
+        client = make_client(lambda prompt, timeout: f"{prompt}: because")
+        prompts = ["NEXT", "EXIT", "HELP", "HELLO", "CARE"]
+        
+        results = client.classify_concurrently(prompts)
+        assert [r["status"] for r in results] == prompts
+    
+    def test_classify_concurrently_isolates_failures(self):
+        """Test a failing request becomes UNKNOWN without losing the others."""
+        def api_call(prompt, timeout):
+            if prompt == "EXIT":
+                raise LLMConnectionError("down")
+            return f"{prompt}: because"
+        
+        client = make_client(api_call)
+        results = client.classify_concurrently(["NEXT", "EXIT", "HELP"])
+        
+        assert [r["status"] for r in results] == ["NEXT", "UNKNOWN", "HELP"]
+        assert "down" in results[1]["message"]
+
+
+class TestLLMClientAvailability:
+    """Unit tests for the cached availability check."""
+    
+    def test_result_is_cached_until_ttl(self):
+        """Test a fresh result is reused and an expired one is rechecked."""
+        calls = []
+        
+        def api_call(prompt, timeout):
+            calls.append(prompt)
+            return "HELLO: ok"
+        
+        client = make_client(api_call)
+        
+        assert client.is_available() is True
+        assert client.is_available() is True
+        assert len(calls) == 1
+        
+        client._available_until = 0.0
+        assert client.is_available() is True
+        assert len(calls) == 2
+    
+    def test_failure_uses_short_ttl(self):
+        """Test a failed check is cached for UNAVAILABLE_TTL only."""
+        def api_call(prompt, timeout):
+            raise LLMConnectionError("down")
+        
+        client = make_client(api_call)
+        before = time.monotonic()
+        
+        assert client.is_available() is False
+        assert client._available_until <= time.monotonic() + client.UNAVAILABLE_TTL
+        assert client._available_until >= before + client.UNAVAILABLE_TTL
+    
+    def test_slow_check_does_not_block_other_callers(self):
+        """Test callers during a slow recheck get the previous result without waiting."""
+        started = threading.Event()
+        release = threading.Event()
+        
+        def api_call(prompt, timeout):
+            started.set()
+            release.wait(5)
+            return "HELLO: ok"
+        
+        client = make_client(api_call)
+        client._available = True
+        
+        checker = threading.Thread(target=client.is_available)
+        checker.start()
+        try:
+            assert started.wait(5)
+            begin = time.monotonic()
+            assert client.is_available() is True
+            assert time.monotonic() - begin < 1
+        finally:
+            release.set()
+            checker.join(5)
+        
+        assert client._available_until > time.monotonic()
+
+
+class StreamingBedrockStub:
+    """bedrock-runtime stub streaming a fixed Converse answer."""
+    
+    def __init__(self, text):
+        self.text = text
+        self.stream_calls = 0
+    
+    def converse_stream(self, **kwargs):
+        self.stream_calls += 1
+        return {"stream": [{"contentBlockDelta": {"delta": {"text": self.text}}}]}
+
+
+class TestLLMClientStatusStreaming:
+    """Unit tests for status-only classification on the Converse API."""
+    
+    def make_bedrock_client(self, text):
+        """Build a Converse-API client whose boto3 client streams text."""
+        client = LLMClient(
+            api_key="test-key", model="anthropic.claude-3-haiku-20240307-v1:0", max_retries=1, retry_delay=0
+        )
+        client._bedrock_client = StreamingBedrockStub(text)
+        return client
+    
+    def test_repeated_input_streams_once(self):
+        """Test a repeated classification is served from the status cache."""
+        client = self.make_bedrock_client("NEXT: moving on")
+        engine = ClassificationEngine(llm_client=client)
+        
+        assert engine.classify_intent("carry on") == "NEXT"
+        assert engine.classify_intent("carry on") == "NEXT"
+        assert client._bedrock_client.stream_calls == 1
+    
+    def test_streamed_status_is_not_a_classify_hit(self):
+        """Test classify() doesn't return a cached streamed status as a full answer."""
+        client = self.make_bedrock_client("NEXT: moving on")
+        client.classify_status("prompt")
+        
+        assert client._get_cached_response(client._response_cache_key("prompt")) is None
+
+
+class TestLLMClientAttributes:
+    """Unit tests for attributes set by callers."""
+    
+    def test_client_accepts_extra_attributes(self):
+        """Test callers can still set and patch attributes of their own."""
+        from unittest.mock import patch
+        
+        client = make_client(lambda prompt, timeout: "HELP: ok")
+        client.label = "primary"
+        
+        with patch.object(client, "classify", return_value={"status": "EXIT", "message": "m"}):
+            assert client.classify("p")["status"] == "EXIT"
+        assert client.label == "primary"
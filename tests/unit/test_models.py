@@ -5,6 +5,18 @@ import json
 from stage_manager.models import Stage, TaskContext, ClassificationResponse
 
 
+# TaskContext fields that each make validation fail, one failure mode per entry
+_INVALID_CONTEXTS = (
+    {"task": "", "status": "not started", "stages": []},
+    {"task": "Sample Task", "status": "", "stages": []},
+    {
+        "task": "Sample Task",
+        "status": "in progress",
+        "stages": [Stage(stage="", description="Invalid stage", timeout=300)]
+    },
+)
+
+
 class TestStage:
     """Unit tests for Stage dataclass."""
     
@@ -104,40 +116,14 @@ class TestTaskContext:
         
         assert task_context.validate() is True
     
-    def test_task_context_validation_empty_task_name(self):
-        """Test validation fails for empty task name."""
-        task_context = TaskContext(
-            task="",
-            description="A sample task",
-            status="not started",
-            stages=[]
-        )
-        
-        assert task_context.validate() is False
-    
-    def test_task_context_validation_empty_status(self):
-        """Test validation fails for empty status."""
-        task_context = TaskContext(
-            task="Sample Task",
-            description="A sample task",
-            status="",
-            stages=[]
-        )
-        
-        assert task_context.validate() is False
-    
-    def test_task_context_validation_invalid_stage(self):
-        """Test validation fails when a stage is invalid."""
-        stages = [
-            Stage(stage="", description="Invalid stage", timeout=300)
-        ]
-        
-        task_context = TaskContext(
-            task="Sample Task",
-            description="A sample task",
-            status="in progress",
-            stages=stages
-        )
+    @pytest.mark.parametrize(
+        "fields",
+        _INVALID_CONTEXTS,
+        ids=("empty_task_name", "empty_status", "invalid_stage")
+    )
+    def test_task_context_validation_invalid(self, fields):
+        """Test validation fails for each invalid TaskContext field."""
+        task_context = TaskContext(description="A sample task", **fields)
         
         assert task_context.validate() is False
     
@@ -308,13 +294,13 @@ class TestClassificationResponse:
         
         assert response is None
     
-    def test_classification_response_all_valid_statuses(self):
+    @pytest.mark.parametrize(
+        "status", ["NEXT", "PREVIOUS", "EXIT", "HELP", "CARE", "HELLO", "UNKNOWN", "ERROR"]
+    )
+    def test_classification_response_all_valid_statuses(self, status):
         """Test all valid status codes."""
-        valid_statuses = ["NEXT", "PREVIOUS", "EXIT", "HELP", "CARE", "HELLO", "UNKNOWN", "ERROR"]
-        
-        for status in valid_statuses:
-            response = ClassificationResponse(
-                status=status,
-                message=f"Testing {status}"
-            )
-            assert response.validate() is True
+        response = ClassificationResponse(
+            status=status,
+            message=f"Testing {status}"
+        )
+        assert response.validate() is True
@@ -0,0 +1,190 @@
+"""Unit tests for StageManager."""
+
+import pytest
+import json
+from stage_manager.stage_manager import StageManager
+
+
+# Valid task context shared by the batch tests; the manager only reads it
+_TASK_CONTEXT = {
+    "task": "onboarding",
+    "description": "New user onboarding",
+    "status": "in progress",
+    "current_stage": "Stage 1",
+    "stages": [
+        {"stage": "Stage 1", "description": "First", "timeout": 300},
+        {"stage": "Stage 2", "description": "Second", "timeout": 300}
+    ]
+}
+
+
+class BatchModel:
+    """Stub BedrockModel answering every batch with one HELP per input."""
+    
+    def __init__(self):
+        self.prompts = []
+    
+    def invoke(self, prompt, system_prompt):
+        self.prompts.append(prompt)
+        inputs = json.loads(prompt.split("User Inputs (JSON array):\n", 1)[1].split("\n", 1)[0])
+        return json.dumps([{"status": "HELP", "message": "m"}] * len(inputs))
+
+
+class TestStageManagerConfig:
+    """Unit tests for constructor configuration handling."""
+    
+    def test_non_dict_config_falls_back_to_defaults(self):
+        """Test a config that isn't a dict is logged and replaced by defaults."""
+        manager = StageManager(config=["x"])
+        
+        assert manager._cache_size == 4096
+        assert manager.classify("next")["status"] == "NEXT"
+    
+    @pytest.mark.parametrize("cache_size", [-1, "10", 1.5, True, None], ids=["negative", "string", "float", "bool", "none"])
+    def test_invalid_cache_size_uses_default(self, cache_size):
+        """Test a cache_size that isn't a non-negative int uses the default."""
+        manager = StageManager(config={"cache_size": cache_size})
+        
+        assert manager._cache_size == 4096
+        assert manager.classify_cached("next")["status"] == "NEXT"
+    
+    def test_zero_cache_size_disables_cache(self):
+        """Test cache_size 0 keeps no entries."""
+        manager = StageManager(config={"cache_size": 0})
+        manager.classify_cached("next")
+        
+        assert len(manager._response_cache) == 0
+
+
+class TestStageManagerClassifyMany:
+    """Unit tests for classifying several inputs with one context."""
+    
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.manager = StageManager()
+    
+    def test_mixed_valid_and_invalid_inputs(self):
+        """Test invalid inputs get ERROR responses in place, valid ones are classified."""
+        results = self.manager.classify_many(["next", "", "quit", "   "])
+        
+        assert [r["status"] for r in results] == ["NEXT", "ERROR", "EXIT", "ERROR"]
+    
+    def test_invalid_context_errors_every_input(self):
+        """Test an invalid context yields one ERROR response per input."""
+        results = self.manager.classify_many(["next", "quit"], {"task": "test"})
+        
+        assert [r["status"] for r in results] == ["ERROR", "ERROR"]
+        assert all("task context" in r["message"] for r in results)
+    
+    def test_llm_batch_uses_single_request(self):
+        """Test valid inputs are classified with one batched LLM request."""
+        model = BatchModel()
+        manager = StageManager(bedrock_model=model)
+        
+        results = manager.classify_many(["banana", "", "apple"], _TASK_CONTEXT)
+        
+        assert [r["status"] for r in results] == ["HELP", "ERROR", "HELP"]
+        assert len(model.prompts) == 1
+
+
+class TestStageManagerClassifyBatch:
+    """Unit tests for classifying pairs with differing contexts."""
+    
+    def test_results_in_pair_order(self):
+        """Test results follow pair order across several contexts."""
+        manager = StageManager()
+        last_stage = dict(_TASK_CONTEXT, current_stage="Stage 2")
+        pairs = [
+            ("next", _TASK_CONTEXT),
+            ("next", last_stage),
+            ("quit", None),
+            ("go back", last_stage),
+            ("go back", _TASK_CONTEXT),
+        ]
+        
+        results = manager.classify_batch(pairs)
+        assert [r["status"] for r in results] == ["NEXT", "UNKNOWN", "EXIT", "PREVIOUS", "UNKNOWN"]
+    
+    def test_equal_contexts_share_one_request(self):
+        """Test equal but separate context dicts are classified together."""
+        model = BatchModel()
+        manager = StageManager(bedrock_model=model)
+        pairs = [("banana", dict(_TASK_CONTEXT)), ("apple", dict(_TASK_CONTEXT))]
+        
+        results = manager.classify_batch(pairs)
+        assert [r["status"] for r in results] == ["HELP", "HELP"]
+        assert len(model.prompts) == 1
+
+
+class TestStageManagerClassifyCached:
+    """Unit tests for memoized classification."""
+    
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.manager = StageManager()
+    
+    def test_repeated_input_is_served_from_cache(self, monkeypatch):
+        """Test a repeated (input, context) pair is classified only once."""
+        calls = []
+        real_classify = self.manager.classify
+        
+        def classify(user_input, task_context=None):
+            calls.append(user_input)
+            return real_classify(user_input, task_context)
+        
+        monkeypatch.setattr(self.manager, "classify", classify)
+        
+        first = self.manager.classify_cached("next", _TASK_CONTEXT)
+        second = self.manager.classify_cached("next", dict(_TASK_CONTEXT))
+        
+        assert first == second
+        assert first["status"] == "NEXT"
+        assert len(calls) == 1
+    
+    def test_returned_response_is_a_copy(self):
+        """Test mutating a returned response doesn't change later hits."""
+        result = self.manager.classify_cached("quit")
+        result["status"] = "CHANGED"
+        
+        assert self.manager.classify_cached("quit")["status"] == "EXIT"
+    
+    def test_uncacheable_context_is_classified_directly(self):
+        """Test a non-serializable context bypasses the cache."""
+        task_context = dict(_TASK_CONTEXT, extra=object())
+        
+        result = self.manager.classify_cached("next", task_context)
+        assert result["status"] == "NEXT"
+        assert len(self.manager._response_cache) == 0
+    
+    def test_error_responses_are_not_cached(self, monkeypatch):
+        """Test ERROR responses are recomputed on the next call."""
+        calls = []
+        
+        def classify(user_input, task_context=None):
+            calls.append(user_input)
+            return {"status": "ERROR", "message": "transient"}
+        
+        monkeypatch.setattr(self.manager, "classify", classify)
+        self.manager.classify_cached("next")
+        self.manager.classify_cached("next")
+        
+        assert len(calls) == 2
+    
+    def test_pattern_only_inputs_share_normalized_entry(self):
+        """Test inputs differing only in case or whitespace share one entry."""
+        for user_input in ("Next", "  next ", "NEXT"):
+            assert self.manager.classify_cached(user_input)["status"] == "NEXT"
+        
+        assert len(self.manager._response_cache) == 1
+    
+    def test_llm_inputs_are_not_normalized(self):
+        """Test an LLM backend keeps inputs differing in case as separate entries."""
+        class EchoModel:
+            def invoke(self, prompt, system_prompt):
+                return "HELP: ok"
+        
+        manager = StageManager(bedrock_model=EchoModel())
+        manager.classify_cached("Next")
+        manager.classify_cached("next")
+        
+        assert len(manager._response_cache) == 2